@@ -0,0 +1,165 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import maps
+import solvers
+from cache import PathCache, map_key
+
+# Answered from per-worker distance fields instead of a fresh search.
+CACHED_ALGORITHM = "Dijkstra-cached"
+
+# Wall masks the worker process has attached to, by map id. Filled once per
+# worker by _attach_maps so tasks only carry a map id and two coordinates.
+_worker_maps = {}
+_worker_keys = {}
+_worker_segments = []
+_worker_cache = PathCache()
+
+
+def _attach_maps(layout):
+    for map_id, (name, shape) in layout.items():
+        # Pool workers share the parent's resource tracker, so attaching
+        # here does not hand ownership of the segment to the worker.
+        segment = shared_memory.SharedMemory(name=name)
+        _worker_segments.append(segment)
+        _worker_maps[map_id] = np.ndarray(shape, dtype=bool, buffer=segment.buf)
+        _worker_keys[map_id] = map_key(_worker_maps[map_id])
+
+
+def _run_job(index, job, keep_visited):
+    options = dict(job.get("options", {}))
+    if job["algorithm"] in ("DFS", "IB-RRT*") and "seed" in job:
+        options["rng"] = random.Random(job["seed"])
+
+    walls = _worker_maps[job["map"]]
+    if job["algorithm"] == CACHED_ALGORITHM:
+        result = _worker_cache.solve(walls, tuple(job["start"]), tuple(job["end"]),
+                                     key=_worker_keys[job["map"]])
+    else:
+        result = solvers.solve(job["algorithm"], walls, tuple(job["start"]), tuple(job["end"]), **options)
+    return {
+        "index": index,
+        "map": job["map"],
+        "algorithm": job["algorithm"],
+        "start": job["start"],
+        "end": job["end"],
+        "found": result.found,
+        "path": result.path,
+        "path_length": result.path_length,
+        "visited": result.visited if keep_visited else None,
+        "stats": result.stats.as_dict(),
+    }
+
+
+def solve_batch(wall_maps, jobs, workers=None, keep_visited=False, max_pending=None):
+    # wall_maps: {map_id: wall mask}. jobs: dicts with "map", "start", "end",
+    # "algorithm" and optionally "options" and "seed". Every map is copied
+    # into shared memory once and each worker attaches to all of them at
+    # start-up, so a job never pickles a grid. Results are yielded as soon as
+    # they finish, in completion order; "index" ties each back to its job.
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 4
+
+    segments = []
+    layout = {}
+    try:
+        for map_id, walls in wall_maps.items():
+            walls = np.ascontiguousarray(walls, dtype=bool)
+            segment = shared_memory.SharedMemory(create=True, size=max(walls.nbytes, 1))
+            segments.append(segment)
+            np.ndarray(walls.shape, dtype=bool, buffer=segment.buf)[:] = walls
+            layout[map_id] = (segment.name, walls.shape)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_maps,
+                                 initargs=(layout,)) as pool:
+            pending = set()
+            queued = iter(enumerate(jobs))
+            exhausted = False
+
+            while pending or not exhausted:
+                # Only a bounded number of jobs are in flight at once, so
+                # huge job lists are consumed lazily.
+                while not exhausted and len(pending) < max_pending:
+                    try:
+                        index, job = next(queued)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.add(pool.submit(_run_job, index, job, keep_visited))
+
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+
+def generate_scenarios(map_count, queries_per_map, width, height, density, algorithms, seed=0):
+    wall_maps = {}
+    jobs = []
+    for map_index in range(map_count):
+        rng = maps.make_rng(seed + map_index)
+        walls = maps.generate_walls(width, height, density, rng)
+        wall_maps[map_index] = walls
+
+        for query in range(queries_per_map):
+            start, end = maps.place_start_and_end(walls, rng, min_distance=(width + height) // 4)
+            for algorithm in algorithms:
+                jobs.append({"map": map_index, "start": start, "end": end,
+                             "algorithm": algorithm, "seed": seed + query})
+    return wall_maps, jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve many (map, start, goal, algorithm) jobs in parallel.")
+    parser.add_argument("--maps", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=10, help="start/goal pairs per map")
+    parser.add_argument("--size", type=maps.parse_size, default=(300, 200), help="map size as WIDTHxHEIGHT")
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--algorithms", nargs="+", default=["A*"],
+                        choices=list(solvers.ALGORITHMS) + [CACHED_ALGORITHM])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--serial", action="store_true", help="also time a single-process run")
+    args = parser.parse_args()
+
+    width, height = args.size
+    wall_maps, jobs = generate_scenarios(args.maps, args.queries, width, height,
+                                         args.density, args.algorithms, args.seed)
+
+    began = time.perf_counter()
+    solved = 0
+    for result in solve_batch(wall_maps, jobs, workers=args.workers):
+        solved += result["found"]
+    elapsed = time.perf_counter() - began
+    print(f"{len(jobs)} jobs, {solved} solved in {elapsed:.2f}s "
+          f"({len(jobs) / elapsed:.1f} jobs/s, {args.workers or os.cpu_count()} workers)")
+
+    if args.serial:
+        began = time.perf_counter()
+        serial_cache = PathCache()
+        serial_keys = {}
+        for job in jobs:
+            if job["algorithm"] == CACHED_ALGORITHM:
+                if job["map"] not in serial_keys:
+                    serial_keys[job["map"]] = map_key(wall_maps[job["map"]])
+                serial_cache.solve(wall_maps[job["map"]], job["start"], job["end"], serial_keys[job["map"]])
+                continue
+            options = {"rng": random.Random(job["seed"])} if job["algorithm"] in ("DFS", "IB-RRT*") else {}
+            solvers.solve(job["algorithm"], wall_maps[job["map"]], job["start"], job["end"], **options)
+        serial = time.perf_counter() - began
+        print(f"serial: {serial:.2f}s ({len(jobs) / serial:.1f} jobs/s), speedup {serial / elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
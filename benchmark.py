@@ -0,0 +1,623 @@
+import argparse
+import csv
+import heapq
+import json
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import maps
+import solvers
+from cache import PathCache, map_key
+from collision import CollisionChecker
+from components import ComponentMap
+from dstar_lite import DStarLite
+from hpa import HierarchicalMap
+
+
+def legacy_a_star(walls, start, end):
+    # The tuple/dict A* the Grid shipped with (Manhattan heuristic, 1.414
+    # diagonals), kept here only as a baseline to measure against.
+    height, width = walls.shape
+
+    def heuristic(current, goal):
+        return abs(current[0] - goal[0]) + abs(current[1] - goal[1])
+
+    g_scores = {start: 0}
+    came_from = {}
+    open_set = [(heuristic(start, end), start)]
+    closed_set = set()
+    expansions = 0
+
+    while open_set:
+        current = heapq.heappop(open_set)[1]
+        expansions += 1
+
+        if current == end:
+            path = [current]
+            while current in came_from:
+                current = came_from[current]
+                path.append(current)
+            return path[::-1], expansions
+
+        closed_set.add(current)
+
+        for dx, dy in solvers.DIRECTIONS:
+            neighbor = (current[0] + dx, current[1] + dy)
+            if (not (0 <= neighbor[0] < width and 0 <= neighbor[1] < height) or
+                    neighbor in closed_set or walls[neighbor[1], neighbor[0]]):
+                continue
+
+            tentative_g = g_scores[current] + (1.414 if dx and dy else 1)
+            if neighbor not in g_scores or tentative_g < g_scores[neighbor]:
+                came_from[neighbor] = current
+                g_scores[neighbor] = tentative_g
+                heapq.heappush(open_set, (tentative_g + heuristic(neighbor, end), neighbor))
+
+    return [], expansions
+
+
+def random_map(width, height, density, seed):
+    rng = maps.make_rng(seed)
+    walls = maps.generate_walls(width, height, density, rng)
+    start, end = maps.place_start_and_end(walls, rng, min_distance=0)
+    return walls, start, end
+
+
+def path_length(path):
+    return solvers.SolveResult("", True, path, [], None).path_length
+
+
+def compare_a_star(width, height, density, seeds):
+    rows = []
+    for seed in range(seeds):
+        walls, start, end = random_map(width, height, density, seed)
+
+        began = time.perf_counter()
+        old_path, old_expansions = legacy_a_star(walls, start, end)
+        old_time = time.perf_counter() - began
+
+        result = solvers.a_star(walls, start, end)
+        rows.append({
+            "seed": seed,
+            "legacy_rate": old_expansions / old_time if old_time else 0.0,
+            "rate": result.stats.expansions / result.stats.elapsed if result.stats.elapsed else 0.0,
+            "legacy_length": path_length(old_path),
+            "length": result.path_length,
+            "found": result.found,
+        })
+    return rows
+
+
+def run_once(algorithm, walls, start, end, seed, measure_memory, profile_path=None):
+    options = {}
+    if algorithm in ("DFS", "IB-RRT*"):
+        options["rng"] = random.Random(seed)
+
+    # The timed run and the memory run are separate so tracemalloc's
+    # bookkeeping never shows up in the timings.
+    began = time.perf_counter()
+    result = solvers.solve(algorithm, walls, start, end, **options)
+    wall_time = time.perf_counter() - began
+
+    peak = None
+    if measure_memory:
+        if algorithm in ("DFS", "IB-RRT*"):
+            options["rng"] = random.Random(seed)
+        tracemalloc.start()
+        solvers.solve(algorithm, walls, start, end, **options)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    if profile_path:
+        if algorithm in ("DFS", "IB-RRT*"):
+            options["rng"] = random.Random(seed)
+        solvers.solve(algorithm, walls, start, end, profile=profile_path, **options)
+
+    return {
+        "algorithm": algorithm,
+        "success": result.found,
+        "wall_time": wall_time,
+        "expansions": result.stats.expansions,
+        "heap_pops": result.stats.heap_pops,
+        "stale_pops": result.stats.stale_pops,
+        "peak_open": result.stats.peak_open,
+        "collision_checks": result.stats.collision_checks,
+        "peak_memory": peak,
+        "path_length": result.path_length if result.found else None,
+    }
+
+
+def run_suite(sizes, densities, maps_per_config, algorithms, base_seed=0, measure_memory=True,
+              profile_dir=None):
+    records = []
+    for width, height in sizes:
+        for density in densities:
+            for index in range(maps_per_config):
+                seed = base_seed + index
+                rng = maps.make_rng(seed)
+                walls = maps.generate_walls(width, height, density, rng)
+                start, end = maps.place_start_and_end(walls, rng, min_distance=(width + height) // 4)
+
+                for algorithm in algorithms:
+                    profile_path = None
+                    if profile_dir:
+                        name = re.sub(r"[^A-Za-z0-9]+", "_", algorithm).strip("_")
+                        profile_path = os.path.join(profile_dir, f"{name}_{width}x{height}_{density}_{seed}.prof")
+                    record = run_once(algorithm, walls, start, end, seed, measure_memory, profile_path)
+                    record.update({"width": width, "height": height, "density": density, "seed": seed})
+                    records.append(record)
+    return records
+
+
+def summarize(records):
+    groups = {}
+    for record in records:
+        key = (f"{record['width']}x{record['height']}", record["density"], record["algorithm"])
+        groups.setdefault(key, []).append(record)
+
+    summary = []
+    for (size, density, algorithm), runs in groups.items():
+        solved = [run for run in runs if run["success"]]
+        peaks = [run["peak_memory"] for run in runs if run["peak_memory"] is not None]
+        summary.append({
+            "size": size,
+            "density": density,
+            "algorithm": algorithm,
+            "runs": len(runs),
+            "success_rate": len(solved) / len(runs),
+            "mean_time": sum(run["wall_time"] for run in runs) / len(runs),
+            "mean_expansions": sum(run["expansions"] for run in runs) / len(runs),
+            "mean_peak_memory": sum(peaks) / len(peaks) if peaks else None,
+            "mean_path_length": (sum(run["path_length"] for run in solved) / len(solved)
+                                 if solved else None),
+        })
+    return summary
+
+
+def print_summary(summary):
+    name = max(len(algorithm) for algorithm in solvers.ALGORITHMS)
+    header = (f"{'size':>9}  {'density':>7}  {'algorithm':<{name}}  {'solved':>6}  {'time ms':>9}  "
+              f"{'expanded':>9}  {'peak KiB':>9}  {'length':>8}")
+    print(header)
+    print("-" * len(header))
+    for row in summary:
+        peak = f"{row['mean_peak_memory'] / 1024:>9.0f}" if row["mean_peak_memory"] is not None else f"{'-':>9}"
+        length = f"{row['mean_path_length']:>8.1f}" if row["mean_path_length"] is not None else f"{'-':>8}"
+        print(f"{row['size']:>9}  {row['density']:>7.2f}  {row['algorithm']:<{name}}  "
+              f"{row['success_rate']:>6.0%}  {row['mean_time'] * 1000:>9.2f}  "
+              f"{row['mean_expansions']:>9.0f}  {peak}  {length}")
+
+
+def write_json(path, records, summary, config):
+    with open(path, "w") as handle:
+        json.dump({"config": config, "summary": summary, "runs": records}, handle, indent=2)
+
+
+def write_csv(path, records):
+    fields = ["width", "height", "density", "seed", "algorithm", "success",
+              "wall_time", "expansions", "heap_pops", "stale_pops", "peak_open",
+              "collision_checks", "peak_memory", "path_length"]
+    with open(path, "w", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def compare_to_baseline(summary, baseline_path, tolerance):
+    # Flags every (size, density, algorithm) group whose mean time grew by
+    # more than the tolerance factor against an earlier --json output.
+    with open(baseline_path) as handle:
+        baseline = {(row["size"], row["density"], row["algorithm"]): row
+                    for row in json.load(handle)["summary"]}
+
+    regressions = []
+    for row in summary:
+        old = baseline.get((row["size"], row["density"], row["algorithm"]))
+        if old is None or not old["mean_time"]:
+            continue
+        ratio = row["mean_time"] / old["mean_time"]
+        if ratio > tolerance:
+            regressions.append((row, ratio))
+            print(f"REGRESSION {row['algorithm']} on {row['size']} @ {row['density']:.2f}: "
+                  f"{ratio:.2f}x slower than baseline")
+    return regressions
+
+
+def print_legacy_comparison(rows):
+    print(f"{'seed':>4}  {'legacy exp/s':>12}  {'exp/s':>12}  {'legacy len':>10}  {'len':>10}")
+    for row in rows:
+        print(f"{row['seed']:>4}  {row['legacy_rate']:>12.0f}  {row['rate']:>12.0f}  "
+              f"{row['legacy_length']:>10.2f}  {row['length']:>10.2f}")
+
+    found = [row for row in rows if row["found"]]
+    shorter = sum(1 for row in found if row["length"] < row["legacy_length"] - 1e-9)
+    longer = sum(1 for row in found if row["length"] > row["legacy_length"] + 1e-9)
+    print(f"\n{len(found)}/{len(rows)} solved, {shorter} shorter and {longer} longer than legacy")
+
+
+def compare_bfs(width, height, density, seeds):
+    # Cells per second for the queue BFS against the frontier-vectorized
+    # and bidirectional versions, plus a check that hop counts agree.
+    rows = []
+    for seed in range(seeds):
+        walls, start, end = random_map(width, height, density, seed)
+        row = {"seed": seed}
+        for algorithm in ("BFS", "BFS-frontier", "BFS-bidir"):
+            result = solvers.solve(algorithm, walls, start, end)
+            elapsed = result.stats.elapsed
+            row[algorithm] = {
+                "rate": result.stats.expansions / elapsed if elapsed else 0.0,
+                "hops": len(result.path) - 1 if result.found else None,
+                "elapsed": elapsed,
+            }
+        rows.append(row)
+    return rows
+
+
+def print_bfs_comparison(rows):
+    names = ("BFS", "BFS-frontier", "BFS-bidir")
+    print(f"{'seed':>4}  " + "  ".join(f"{name + ' cells/s':>22}" for name in names) + f"  {'hops':>6}")
+    for row in rows:
+        hops = {row[name]["hops"] for name in names}
+        agree = hops.pop() if len(hops) == 1 else "MISMATCH"
+        print(f"{row['seed']:>4}  " + "  ".join(f"{row[name]['rate']:>22.0f}" for name in names) +
+              f"  {agree if agree is not None else '-':>6}")
+
+    for name in names[1:]:
+        speedup = sum(row["BFS"]["elapsed"] for row in rows) / sum(row[name]["elapsed"] for row in rows)
+        print(f"{name}: {speedup:.1f}x the wall-clock speed of BFS")
+
+
+def compare_cache(width, height, density, goals, queries, seed=0):
+    # Many starts toward a few goals on one map: a fresh A* per query
+    # against the per-map distance-field cache.
+    rng = maps.make_rng(seed)
+    walls = maps.generate_walls(width, height, density, rng)
+    free = np.flatnonzero(~walls)
+    cells = [(int(cell % width), int(cell // width))
+             for cell in rng.choice(free, size=goals + queries, replace=False)]
+    goal_cells, start_cells = cells[:goals], cells[goals:]
+    pairs = [(start, goal_cells[index % goals]) for index, start in enumerate(start_cells)]
+
+    began = time.perf_counter()
+    fresh = [solvers.a_star(walls, start, goal) for start, goal in pairs]
+    fresh_time = time.perf_counter() - began
+
+    cache = PathCache()
+    began = time.perf_counter()
+    key = map_key(walls)
+    cached = [cache.solve(walls, start, goal, key) for start, goal in pairs]
+    cached_time = time.perf_counter() - began
+
+    mismatched = sum(1 for a, b in zip(fresh, cached)
+                     if a.found != b.found or abs(a.path_length - b.path_length) > 1e-6)
+    return {"queries": len(pairs), "a_star_time": fresh_time, "cached_time": cached_time,
+            "hits": cache.hits, "misses": cache.misses, "cache_bytes": cache.nbytes,
+            "mismatched": mismatched}
+
+
+def compare_hpa(width, height, density, cluster_size, queries, edits, seed=0):
+    # One-off hierarchy build, then abstract-only and refined HPA* queries
+    # against A*, then single-cell edits that rebuild only nearby clusters.
+    rng = maps.make_rng(seed)
+    walls = maps.generate_walls(width, height, density, rng)
+
+    began = time.perf_counter()
+    hierarchy = HierarchicalMap(walls, cluster_size)
+    build_time = time.perf_counter() - began
+
+    pairs = [maps.place_start_and_end(walls, rng, min_distance=(width + height) // 4) for _ in range(queries)]
+
+    began = time.perf_counter()
+    fresh = [solvers.a_star(walls, start, end) for start, end in pairs]
+    a_star_time = time.perf_counter() - began
+
+    began = time.perf_counter()
+    for start, end in pairs:
+        hierarchy.find_path(start, end, refine=False)
+    abstract_time = time.perf_counter() - began
+
+    began = time.perf_counter()
+    refined = [hierarchy.find_path(start, end) for start, end in pairs]
+    refined_time = time.perf_counter() - began
+
+    ratios = [b.path_length / a.path_length for a, b in zip(fresh, refined) if a.found and a.path_length]
+    free = np.flatnonzero(~walls)
+    began = time.perf_counter()
+    for cell in rng.choice(free, size=edits, replace=False):
+        hierarchy.update_cells([((int(cell % width), int(cell // width)), True)])
+    edit_time = time.perf_counter() - began
+
+    return {"queries": queries, "build_time": build_time, "a_star_time": a_star_time,
+            "abstract_time": abstract_time, "refined_time": refined_time,
+            "mean_ratio": sum(ratios) / len(ratios) if ratios else None,
+            "max_ratio": max(ratios) if ratios else None,
+            "mismatched": sum(1 for a, b in zip(fresh, refined) if a.found != b.found),
+            "edits": edits, "edit_time": edit_time}
+
+
+def compare_replan(width, height, density, edits, cells_per_edit, seed=0):
+    # Walls dropped onto the current path, then D* Lite repairing its
+    # previous search against A* starting cold after every edit.
+    rng = maps.make_rng(seed)
+    walls = maps.generate_walls(width, height, density, rng)
+    start, end = maps.place_start_and_end(walls, rng, min_distance=(width + height) // 4)
+
+    planner = DStarLite(walls, start, end)
+    began = time.perf_counter()
+    result = planner.replan()
+    initial_time = time.perf_counter() - began
+
+    replan_time = a_star_time = 0.0
+    replan_expansions = a_star_expansions = mismatched = applied = 0
+    for _ in range(edits):
+        # Edits go on the current path, so they stop once there is none.
+        if not result.found or len(result.path) < 3:
+            break
+        applied += 1
+        inner = result.path[1:-1]
+        changes = [(inner[int(index)], True)
+                   for index in rng.choice(len(inner), size=min(cells_per_edit, len(inner)), replace=False)]
+        for (x, y), is_wall in changes:
+            walls[y, x] = is_wall
+        planner.update_cells(changes)
+
+        began = time.perf_counter()
+        result = planner.replan()
+        replan_time += time.perf_counter() - began
+        replan_expansions += result.stats.expansions
+
+        fresh = solvers.a_star(walls, start, end)
+        a_star_time += fresh.stats.elapsed
+        a_star_expansions += fresh.stats.expansions
+        mismatched += fresh.found != result.found or abs(fresh.path_length - result.path_length) > 1e-6
+
+    return {"initial_time": initial_time, "edits": applied, "replan_time": replan_time,
+            "a_star_time": a_star_time, "replan_expansions": replan_expansions,
+            "a_star_expansions": a_star_expansions, "mismatched": mismatched}
+
+
+def compare_any_angle(width, height, density, queries, seed=0):
+    # Path length and time against plain A*: the shortcut pass on A* and
+    # IB-RRT* output, and Lazy Theta* searching any-angle directly. The
+    # shortcut time is the pass alone, on top of the solver it smooths.
+    rng = maps.make_rng(seed)
+    walls = maps.generate_walls(width, height, density, rng)
+    checker = CollisionChecker(walls)
+    rows = {name: {"time": 0.0, "ratios": []}
+            for name in ("A*", "A* + shortcut", "Theta*", "IB-RRT*", "IB-RRT* + shortcut")}
+
+    def record(name, result, base):
+        rows[name]["time"] += result.stats.elapsed
+        if result.found and base.path_length:
+            rows[name]["ratios"].append(result.path_length / base.path_length)
+
+    for index in range(queries):
+        start, end = maps.place_start_and_end(walls, rng, min_distance=(width + height) // 4)
+        base = solvers.a_star(walls, start, end)
+        if not base.found:
+            continue
+        record("A*", base, base)
+        smoothed = solvers.smooth(base, checker=checker)
+        smoothed.stats.elapsed -= base.stats.elapsed
+        record("A* + shortcut", smoothed, base)
+        record("Theta*", solvers.lazy_theta_star(walls, start, end, checker=checker), base)
+        tree = solvers.ib_rrt_star(walls, start, end, rng=random.Random(seed + index), checker=checker)
+        record("IB-RRT*", tree, base)
+        smoothed = solvers.smooth(tree, checker=checker)
+        smoothed.stats.elapsed -= tree.stats.elapsed
+        record("IB-RRT* + shortcut", smoothed, base)
+
+    a_star_time = rows["A*"]["time"]
+    return [{"method": name, "time": row["time"], "extra": row["time"] / a_star_time if a_star_time else 0.0,
+             "solved": len(row["ratios"]), "mean_ratio": float(np.mean(row["ratios"])) if row["ratios"] else 0.0}
+            for name, row in rows.items()]
+
+
+def print_any_angle(rows):
+    print(f"{'method':<20} {'time':>9} {'x A*':>7} {'solved':>7} {'length x A*':>12}")
+    for row in rows:
+        print(f"{row['method']:<20} {row['time']:>8.3f}s {row['extra']:>7.2f} {row['solved']:>7} "
+              f"{row['mean_ratio']:>12.3f}")
+
+
+def compare_components(width, height, density, queries, edits, algorithm="A*", seed=0):
+    # Queries between cells in different components, searched to exhaustion
+    # against rejected by the component labels, then edit upkeep against
+    # labelling the map from scratch.
+    rng = maps.make_rng(seed)
+    walls = maps.generate_walls(width, height, density, rng)
+    began = time.perf_counter()
+    labelled = ComponentMap(walls)
+    build_time = time.perf_counter() - began
+
+    # A map with fewer than two components has no unreachable pairs.
+    labels = labelled.labels.ravel()
+    pairs = []
+    if labelled.labels.max() > 0:
+        largest = np.bincount(labels[labels > 0]).argmax()
+        inside = np.flatnonzero(labels == largest)
+        outside = np.flatnonzero((labels > 0) & (labels != largest))
+        if len(outside):
+            pairs = [((int(a % width), int(a // width)), (int(b % width), int(b // width)))
+                     for a, b in zip(rng.choice(inside, size=queries), rng.choice(outside, size=queries))]
+
+    search_time = checked_time = 0.0
+    for start, end in pairs:
+        began = time.perf_counter()
+        solvers.solve(algorithm, walls, start, end)
+        search_time += time.perf_counter() - began
+        began = time.perf_counter()
+        solvers.solve(algorithm, walls, start, end, components=labelled)
+        checked_time += time.perf_counter() - began
+
+    cells = rng.integers(0, [width, height], size=(edits, 2))
+    began = time.perf_counter()
+    for x, y in cells:
+        walls[y, x] = not walls[y, x]
+        labelled.update_cells([((int(x), int(y)), walls[y, x])])
+    edit_time = time.perf_counter() - began
+    began = time.perf_counter()
+    fresh = maps.label_components(walls)
+    relabel_time = time.perf_counter() - began
+    # The labels agree when they pair up one to one: every fresh component
+    # has a single incremental label and no incremental label spans two.
+    free = fresh > 0
+    matched = len(set(zip(fresh[free].tolist(), labelled.labels[free].tolist())))
+    mismatched = int((free != (labelled.labels > 0)).sum() + 2 * matched -
+                     len(np.unique(fresh[free])) - len(np.unique(labelled.labels[free])))
+
+    return {"build_time": build_time, "queries": len(pairs), "search_time": search_time,
+            "checked_time": checked_time, "edits": edits, "edit_time": edit_time,
+            "relabel_time": relabel_time, "relabels": labelled.relabels, "mismatched": mismatched}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pathfinding solvers headless.")
+    commands = parser.add_subparsers(dest="command")
+
+    suite = commands.add_parser("suite", help="run every algorithm over seeded map suites")
+    suite.add_argument("--sizes", nargs="+", type=maps.parse_size, default=[(114, 85), (300, 200)],
+                       help="map sizes as WIDTHxHEIGHT")
+    suite.add_argument("--densities", nargs="+", type=float, default=[0.1, 0.3])
+    suite.add_argument("--maps", type=int, default=5, help="seeded maps per size/density")
+    suite.add_argument("--seed", type=int, default=0, help="first map seed")
+    suite.add_argument("--algorithms", nargs="+", default=list(solvers.ALGORITHMS),
+                       choices=list(solvers.ALGORITHMS))
+    suite.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    suite.add_argument("--profile", metavar="DIR",
+                       help="also run each solve under cProfile and dump .prof files here")
+    suite.add_argument("--json", help="write config, summary and every run as JSON")
+    suite.add_argument("--csv", help="write every run as CSV")
+    suite.add_argument("--baseline", help="earlier --json output to check for regressions")
+    suite.add_argument("--tolerance", type=float, default=1.25,
+                       help="allowed slowdown factor against --baseline")
+
+    legacy = commands.add_parser("astar-legacy", help="compare A* against the old tuple/dict A*")
+    legacy.add_argument("--width", type=int, default=300)
+    legacy.add_argument("--height", type=int, default=200)
+    legacy.add_argument("--density", type=float, default=0.3)
+    legacy.add_argument("--seeds", type=int, default=10)
+
+    bfs = commands.add_parser("bfs-throughput", help="compare queue, frontier and bidirectional BFS")
+    bfs.add_argument("--width", type=int, default=1000)
+    bfs.add_argument("--height", type=int, default=1000)
+    bfs.add_argument("--density", type=float, default=0.3)
+    bfs.add_argument("--seeds", type=int, default=3)
+
+    cached = commands.add_parser("cache", help="repeated queries: fresh A* against the path cache")
+    cached.add_argument("--width", type=int, default=300)
+    cached.add_argument("--height", type=int, default=200)
+    cached.add_argument("--density", type=float, default=0.3)
+    cached.add_argument("--goals", type=int, default=3)
+    cached.add_argument("--queries", type=int, default=200)
+
+    hierarchical = commands.add_parser("hpa", help="HPA* build, query and edit costs against A*")
+    hierarchical.add_argument("--width", type=int, default=1000)
+    hierarchical.add_argument("--height", type=int, default=1000)
+    hierarchical.add_argument("--density", type=float, default=0.3)
+    hierarchical.add_argument("--cluster-size", type=int, default=16)
+    hierarchical.add_argument("--queries", type=int, default=20)
+    hierarchical.add_argument("--edits", type=int, default=20)
+
+    replan = commands.add_parser("replan", help="D* Lite repairs against fresh A* after wall edits")
+    replan.add_argument("--width", type=int, default=300)
+    replan.add_argument("--height", type=int, default=200)
+    replan.add_argument("--density", type=float, default=0.3)
+    replan.add_argument("--edits", type=int, default=50)
+    replan.add_argument("--cells-per-edit", type=int, default=1)
+
+    angle = commands.add_parser("any-angle", help="Theta* and path shortcutting against A*")
+    angle.add_argument("--width", type=int, default=300)
+    angle.add_argument("--height", type=int, default=200)
+    angle.add_argument("--density", type=float, default=0.3)
+    angle.add_argument("--queries", type=int, default=20)
+
+    labelled = commands.add_parser("components", help="O(1) no-path answers from component labels")
+    labelled.add_argument("--width", type=int, default=300)
+    labelled.add_argument("--height", type=int, default=200)
+    labelled.add_argument("--density", type=float, default=0.3)
+    labelled.add_argument("--queries", type=int, default=20)
+    labelled.add_argument("--edits", type=int, default=200)
+    labelled.add_argument("--algorithm", default="A*", choices=list(solvers.ALGORITHMS))
+
+    # "suite" is the default command, so plain `python benchmark.py --maps 3` works.
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] not in list(commands.choices) + ["-h", "--help"]:
+        argv = ["suite"] + argv
+    args = parser.parse_args(argv)
+
+    if args.command == "astar-legacy":
+        print_legacy_comparison(compare_a_star(args.width, args.height, args.density, args.seeds))
+        return 0
+    if args.command == "bfs-throughput":
+        print_bfs_comparison(compare_bfs(args.width, args.height, args.density, args.seeds))
+        return 0
+    if args.command == "cache":
+        row = compare_cache(args.width, args.height, args.density, args.goals, args.queries)
+        print(f"{row['queries']} queries: A* {row['a_star_time']:.3f}s, cached {row['cached_time']:.3f}s "
+              f"({row['misses']} floods, {row['hits']} hits, {row['cache_bytes'] / 2 ** 20:.1f} MiB); "
+              f"{row['mismatched']} path costs differ")
+        return 0
+    if args.command == "replan":
+        row = compare_replan(args.width, args.height, args.density, args.edits, args.cells_per_edit)
+        print(f"initial plan {row['initial_time']:.3f}s; {row['edits']} edits: "
+              f"D* Lite {row['replan_time']:.3f}s ({row['replan_expansions']} expansions), "
+              f"A* {row['a_star_time']:.3f}s ({row['a_star_expansions']} expansions); "
+              f"{row['mismatched']} path costs differ")
+        return 0
+    if args.command == "any-angle":
+        print_any_angle(compare_any_angle(args.width, args.height, args.density, args.queries))
+        return 0
+    if args.command == "components":
+        row = compare_components(args.width, args.height, args.density, args.queries, args.edits, args.algorithm)
+        print(f"labels built in {row['build_time'] * 1000:.1f}ms; {row['queries']} unreachable queries: "
+              f"searched {row['search_time']:.3f}s, rejected {row['checked_time'] * 1000:.2f}ms; "
+              f"{row['edits']} edits {row['edit_time'] * 1000 / max(row['edits'], 1):.3f}ms each "
+              f"({row['relabels']} full relabels) against {row['relabel_time'] * 1000:.1f}ms from scratch; "
+              f"{row['mismatched']} labels differ")
+        return 0
+    if args.command == "hpa":
+        row = compare_hpa(args.width, args.height, args.density, args.cluster_size, args.queries, args.edits)
+        mean = f"x{row['mean_ratio']:.3f}" if row["mean_ratio"] is not None else "-"
+        worst = f"x{row['max_ratio']:.3f}" if row["max_ratio"] is not None else "-"
+        print(f"build {row['build_time']:.2f}s; {row['queries']} queries: A* {row['a_star_time']:.3f}s, "
+              f"HPA* abstract {row['abstract_time']:.3f}s, refined {row['refined_time']:.3f}s "
+              f"(length {mean} mean, {worst} worst, "
+              f"{row['mismatched']} reachability mismatches); "
+              f"{row['edits']} edits {row['edit_time'] * 1000 / max(row['edits'], 1):.1f}ms each")
+        return 0
+
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+    records = run_suite(args.sizes, args.densities, args.maps, args.algorithms,
+                        base_seed=args.seed, measure_memory=not args.no_memory,
+                        profile_dir=args.profile)
+    summary = summarize(records)
+    print_summary(summary)
+
+    config = {
+        "sizes": [f"{width}x{height}" for width, height in args.sizes],
+        "densities": args.densities,
+        "maps": args.maps,
+        "seed": args.seed,
+        "algorithms": args.algorithms,
+    }
+    if args.json:
+        write_json(args.json, records, summary, config)
+    if args.csv:
+        write_csv(args.csv, records)
+
+    if args.baseline and compare_to_baseline(summary, args.baseline, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import hashlib
+import heapq
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from solvers import DIAGONAL_COST, DIRECTIONS, SolveResult, SolveStats, _as_walls, _pad_walls, _walk_back
+
+
+def map_key(walls):
+    walls = _as_walls(walls)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.array(walls.shape, dtype=np.int64).tobytes())
+    digest.update(np.packbits(walls).tobytes())
+    return digest.hexdigest()
+
+
+class DistanceField:
+    # Single-source Dijkstra over the whole reachable region of a map, with
+    # the same 8-connected octile costs as a_star. Moves are symmetric, so a
+    # field rooted at a goal answers "path from anywhere to the goal" and a
+    # field rooted at a source answers "path from the source to anywhere",
+    # each by walking parent pointers in O(path length).
+    def __init__(self, walls, root):
+        walls = _as_walls(walls)
+        height, width = walls.shape
+        self.root = root
+        self.shape = walls.shape
+        self.stride = width + 2
+
+        size = self.stride * (height + 2)
+        blocked = memoryview(_pad_walls(walls).ravel())
+        self.distances = np.full(size, np.inf)
+        self.parents = np.full(size, -1, dtype=np.int32)
+        distances = memoryview(self.distances)
+        parents = memoryview(self.parents)
+
+        moves = [(dy * self.stride + dx, DIAGONAL_COST if dx and dy else 1.0) for dx, dy in DIRECTIONS]
+        root_id = self._id(root)
+        distances[root_id] = 0.0
+        heap = [(0.0, root_id)]
+        self.expansions = 0
+
+        while heap:
+            dist, current = heapq.heappop(heap)
+            if dist > distances[current]:
+                continue
+            self.expansions += 1
+            for offset, cost in moves:
+                neighbor = current + offset
+                if blocked[neighbor]:
+                    continue
+                candidate = dist + cost
+                if candidate < distances[neighbor]:
+                    distances[neighbor] = candidate
+                    parents[neighbor] = current
+                    heapq.heappush(heap, (candidate, neighbor))
+
+    @property
+    def nbytes(self):
+        return self.distances.nbytes + self.parents.nbytes
+
+    def _id(self, cell):
+        return (cell[1] + 1) * self.stride + cell[0] + 1
+
+    def cost_to(self, cell):
+        return float(self.distances[self._id(cell)])
+
+    def path_from(self, cell):
+        # cell -> root, or [] if cell cannot reach the root.
+        current = self._id(cell)
+        if self.distances[current] == np.inf:
+            return []
+        return _walk_back(self.parents, current, self.stride)
+
+
+class PathCache:
+    # Distance fields per (map hash, root cell), evicted least recently used
+    # first once their combined size passes max_bytes. The first query
+    # toward a goal pays for one full Dijkstra flood; every later query to
+    # that goal, or from a cached source, is answered in O(path length).
+    # That holds only when the caller passes key=map_key(walls), computed
+    # once per map; without it every query hashes the whole map.
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.fields = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.fields)
+
+    def cached(self, key, root):
+        field = self.fields.get((key, root))
+        if field is not None:
+            self.fields.move_to_end((key, root))
+        return field
+
+    def field(self, walls, root, key=None):
+        key = key or map_key(walls)
+        field = self.cached(key, root)
+        if field is None:
+            field = DistanceField(walls, root)
+            self.fields[key, root] = field
+            self.nbytes += field.nbytes
+            while self.nbytes > self.max_bytes and len(self.fields) > 1:
+                _, evicted = self.fields.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return field
+
+    def invalidate(self, key):
+        for entry in [entry for entry in self.fields if entry[0] == key]:
+            self.nbytes -= self.fields.pop(entry).nbytes
+
+    def solve(self, walls, start, end, key=None):
+        stats = SolveStats()
+        started = time.perf_counter()
+        walls = _as_walls(walls)
+        height, width = walls.shape
+        for x, y in (start, end):
+            if not (0 <= x < width and 0 <= y < height) or walls[y, x]:
+                stats.elapsed = time.perf_counter() - started
+                return SolveResult("Dijkstra-cached", False, [], [], stats)
+        key = key or map_key(walls)
+
+        field = self.cached(key, end)
+        if field is not None:
+            path = field.path_from(start)
+        else:
+            field = self.cached(key, start)
+            if field is not None:
+                path = field.path_from(end)[::-1]
+            else:
+                field = self.field(walls, end, key)
+                stats.expansions = field.expansions
+                path = field.path_from(start)
+
+        if stats.expansions:
+            self.misses += 1
+        else:
+            self.hits += 1
+        stats.elapsed = time.perf_counter() - started
+        return SolveResult("Dijkstra-cached", bool(path), path, [], stats)
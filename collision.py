@@ -0,0 +1,222 @@
+import numpy as np
+
+# Segments up to this many steps are walked cell by cell rather than
+# box-tested; at that length the walk is the cheaper of the two.
+SHORT_SEGMENT = 6
+
+# Batches smaller than this are walked one segment at a time: below it the
+# NumPy set-up in segments_clear costs more than the walks save.
+BATCH_SEGMENTS = 200
+
+
+def interpolate_path(start_pos, end_pos):
+    # Always trace from the smaller endpoint so A->B and B->A cover the same
+    # cells; a segment checked while growing one tree stays valid when the
+    # final path walks it the other way.
+    if end_pos < start_pos:
+        return interpolate_path(end_pos, start_pos)[::-1]
+
+    path = []
+    x1, y1 = start_pos
+    x2, y2 = end_pos
+    dx = abs(x2 - x1)
+    dy = abs(y2 - y1)
+    x, y = x1, y1
+
+    step_x = 1 if x1 < x2 else -1
+    step_y = 1 if y1 < y2 else -1
+
+    if dx > dy:
+        err = dx / 2.0
+        while x != x2:
+            path.append((x, y))
+            err -= dy
+            if err < 0:
+                y += step_y
+                err += dx
+            x += step_x
+    else:
+        err = dy / 2.0
+        while y != y2:
+            path.append((x, y))
+            err -= dx
+            if err < 0:
+                x += step_x
+                err += dy
+            y += step_y
+
+    path.append((x2, y2))
+    return path
+
+
+class CollisionChecker:
+    # Segment-vs-wall tests over one wall mask, cell for cell the same
+    # answer as walking interpolate_path. Two precomputed tables settle most
+    # segments in O(1): an integral image (a segment whose bounding box has
+    # no walls is clear) and a Chebyshev clearance map (every cell closer to
+    # an endpoint than its clearance is free, so a segment shorter than the
+    # two endpoint clearances together is clear). Only the rest get an
+    # exact check, done with NumPy over all their cells at once.
+    def __init__(self, walls):
+        walls = np.asarray(walls, dtype=bool)
+        self.height, self.width = walls.shape
+        self.walls = walls
+        # Everything outside the map counts as wall.
+        self.padded = np.ones((self.height + 2, self.width + 2), dtype=bool)
+        self.padded[1:-1, 1:-1] = walls
+        self._blocked = memoryview(self.padded.ravel())
+        self.stride = self.width + 2
+
+        self.integral = np.zeros((self.height + 1, self.width + 1), dtype=np.int64)
+        self.integral[1:, 1:] = walls.cumsum(axis=0).cumsum(axis=1)
+        self._integral = memoryview(self.integral.ravel())
+        self.clearance = self._chebyshev_clearance()
+        self._clearance = memoryview(self.clearance.ravel())
+
+        self.checks = 0
+        self.quick = 0
+
+    def _chebyshev_clearance(self):
+        # Distance in king moves from each cell to the nearest wall or the
+        # map edge (walls are 0), as a two-pass distance transform: a
+        # forward raster pass takes the rows above and the cells to the
+        # left, a backward pass the rows below and the cells to the right.
+        # Each row is one NumPy step; the run along a row is a running
+        # minimum of (distance - column), shifted back by the column.
+        far = self.height + self.width
+        clearance = np.where(self.padded, 0, far).astype(np.int32)
+        height, width = clearance.shape
+        columns = np.arange(width, dtype=np.int32)
+        for y in range(1, height):
+            row, above = clearance[y], clearance[y - 1]
+            np.minimum(row, above + 1, out=row)
+            np.minimum(row[1:], above[:-1] + 1, out=row[1:])
+            np.minimum(row[:-1], above[1:] + 1, out=row[:-1])
+            row[:] = columns + np.minimum.accumulate(row - columns)
+        for y in range(height - 2, -1, -1):
+            row, below = clearance[y], clearance[y + 1]
+            np.minimum(row, below + 1, out=row)
+            np.minimum(row[1:], below[:-1] + 1, out=row[1:])
+            np.minimum(row[:-1], below[1:] + 1, out=row[:-1])
+            row[::-1] = columns + np.minimum.accumulate(row[::-1] - columns)
+        return clearance
+
+    def blocked(self, x, y):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return True
+        return bool(self._blocked[(y + 1) * self.stride + x + 1])
+
+    def box_walls(self, x0, y0, x1, y1):
+        # Walls inside the inclusive box, from the integral image.
+        integral, row = self._integral, self.width + 1
+        return (integral[(y1 + 1) * row + x1 + 1] - integral[y0 * row + x1 + 1] -
+                integral[(y1 + 1) * row + x0] + integral[y0 * row + x0])
+
+    def line_of_sight(self, start, end):
+        self.checks += 1
+        (x1, y1), (x2, y2) = start, end
+        width, height, stride = self.width, self.height, self.stride
+        if not (0 <= x1 < width and 0 <= y1 < height and 0 <= x2 < width and 0 <= y2 < height):
+            self.quick += 1
+            return False
+        id1 = (y1 + 1) * stride + x1 + 1
+        id2 = (y2 + 1) * stride + x2 + 1
+        blocked = self._blocked
+        if blocked[id1] or blocked[id2]:
+            self.quick += 1
+            return False
+
+        length = max(abs(x2 - x1), abs(y2 - y1))
+        if length < self._clearance[id1] + self._clearance[id2]:
+            self.quick += 1
+            return True
+        # Short segments are cheaper to walk than to box-test.
+        if length > SHORT_SEGMENT and not self.box_walls(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)):
+            self.quick += 1
+            return True
+
+        # interpolate_path's cells, walked in place so the first wall ends it.
+        if end < start:
+            x1, y1, x2, y2, id1 = x2, y2, x1, y1, id2
+        dx, dy = abs(x2 - x1), abs(y2 - y1)
+        step_x = 1 if x1 < x2 else -1
+        step_y = stride if y1 < y2 else -stride
+        if dx > dy:
+            major, minor, major_step, minor_step = dx, dy, step_x, step_y
+        else:
+            major, minor, major_step, minor_step = dy, dx, step_y, step_x
+        err = major / 2.0
+        cell = id1
+        for _ in range(major - 1):
+            err -= minor
+            if err < 0:
+                cell += minor_step
+                err += major
+            cell += major_step
+            if blocked[cell]:
+                return False
+        return True
+
+    def segments_clear(self, starts, ends):
+        # Vectorised line_of_sight over N segments given as (N, 2) arrays of
+        # (x, y); returns a bool array.
+        starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.int64).reshape(-1, 2)
+        if len(starts) < BATCH_SEGMENTS:
+            return np.array([self.line_of_sight(start, end) for start, end in zip(starts.tolist(), ends.tolist())],
+                            dtype=bool)
+        self.checks += len(starts)
+
+        # Trace every segment from its smaller endpoint, as interpolate_path does.
+        swap = (ends[:, 0] < starts[:, 0]) | ((ends[:, 0] == starts[:, 0]) & (ends[:, 1] < starts[:, 1]))
+        first = np.where(swap[:, None], ends, starts)
+        last = np.where(swap[:, None], starts, ends)
+        x1, y1 = first[:, 0], first[:, 1]
+        x2, y2 = last[:, 0], last[:, 1]
+
+        inside = ((np.minimum(x1, x2) >= 0) & (np.maximum(x1, x2) < self.width) &
+                  (np.minimum(y1, y2) >= 0) & (np.maximum(y1, y2) < self.height))
+        clear = inside.copy()
+        ids1 = (np.clip(y1, -1, self.height) + 1) * self.stride + np.clip(x1, -1, self.width) + 1
+        ids2 = (np.clip(y2, -1, self.height) + 1) * self.stride + np.clip(x2, -1, self.width) + 1
+        flat_blocked = self.padded.ravel()
+        clear &= ~flat_blocked[ids1] & ~flat_blocked[ids2]
+
+        dx, dy = np.abs(x2 - x1), np.abs(y2 - y1)
+        length = np.maximum(dx, dy)
+        flat_clearance = self.clearance.ravel()
+        low_x, high_x = np.clip(np.minimum(x1, x2), 0, self.width - 1), np.clip(np.maximum(x1, x2), 0, self.width - 1)
+        low_y, high_y = np.clip(np.minimum(y1, y2), 0, self.height - 1), np.clip(np.maximum(y1, y2), 0, self.height - 1)
+        integral = self.integral
+        box = (integral[high_y + 1, high_x + 1] - integral[low_y, high_x + 1] -
+               integral[high_y + 1, low_x] + integral[low_y, low_x])
+        settled = ~clear | (length < flat_clearance[ids1] + flat_clearance[ids2]) | (box == 0)
+        self.quick += int(settled.sum())
+
+        exact = np.flatnonzero(~settled)
+        if not len(exact):
+            return clear
+
+        # Every remaining segment's cells in one flat array: segment i owns
+        # length[i] + 1 consecutive entries.
+        counts = length[exact] + 1
+        owner = np.repeat(np.arange(len(exact)), counts)
+        step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        ex1, ey1, edx, edy = x1[exact][owner], y1[exact][owner], dx[exact][owner], dy[exact][owner]
+        step_x = np.where(x2[exact] >= x1[exact], 1, -1)[owner]
+        step_y = np.where(y2[exact] >= y1[exact], 1, -1)[owner]
+        x_major = edx > edy
+        major = np.where(x_major, edx, edy)
+        minor = np.where(x_major, edy, edx)
+        # Closed form of interpolate_path's error accumulator: after k major
+        # steps the minor axis has moved ceil((2k * minor - major) / (2 * major))
+        # times, never below zero.
+        moved = np.maximum(-((major - 2 * step * minor) // np.maximum(2 * major, 1)), 0)
+        xs = ex1 + step_x * np.where(x_major, step, moved)
+        ys = ey1 + step_y * np.where(x_major, moved, step)
+
+        hits = np.bincount(owner, weights=flat_blocked[(ys + 1) * self.stride + xs + 1],
+                           minlength=len(exact))
+        clear[exact] = hits == 0
+        return clear
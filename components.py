@@ -0,0 +1,157 @@
+from collections import deque
+
+import numpy as np
+
+from maps import label_components
+from solvers import DIRECTIONS
+
+# Cells the local floods in _close may visit before falling back to
+# relabelling the whole component with label_components.
+FLOOD_LIMIT = 4096
+
+# The eight neighbours of a cell in order around it, so cells next to each
+# other in the list (wrapping around) touch.
+RING = [(-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0)]
+
+
+class ComponentMap:
+    # 8-connected component labels of a wall mask, kept current under edits
+    # so "is there any path from a to b" is one array lookup. Opening a cell
+    # joins the components around it. Closing one can only split its
+    # component when the free cells around it stop touching each other, and
+    # even then a flood from each side usually meets the others, or runs out
+    # on a small cut-off piece, after a few cells.
+    def __init__(self, walls):
+        self.walls = np.array(walls, dtype=bool)
+        self.height, self.width = self.walls.shape
+        self.labels = label_components(self.walls)
+        self.next_label = int(self.labels.max()) + 1
+        self.relabels = 0
+
+    def label(self, cell):
+        x, y = cell
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return 0
+        return int(self.labels[y, x])
+
+    def connected(self, a, b):
+        label = self.label(a)
+        return label != 0 and label == self.label(b)
+
+    def _free_neighbours(self, x, y):
+        return [(x + dx, y + dy) for dx, dy in DIRECTIONS
+                if 0 <= x + dx < self.width and 0 <= y + dy < self.height and not self.walls[y + dy, x + dx]]
+
+    def _ring_groups(self, x, y):
+        # One cell from each separate group the free cells around (x, y) form
+        # when (x, y) itself is not there to join them.
+        free = [(x + dx, y + dy) for dx, dy in RING
+                if 0 <= x + dx < self.width and 0 <= y + dy < self.height and not self.walls[y + dy, x + dx]]
+        groups = []
+        seen = set()
+        for cell in free:
+            if cell in seen:
+                continue
+            groups.append(cell)
+            stack = [cell]
+            seen.add(cell)
+            while stack:
+                cx, cy = stack.pop()
+                for other in free:
+                    if other not in seen and max(abs(other[0] - cx), abs(other[1] - cy)) == 1:
+                        seen.add(other)
+                        stack.append(other)
+        return groups
+
+    def _flood_pieces(self, starts):
+        # Floods from every start in turn, merging floods that meet. A flood
+        # that runs dry has covered a whole piece cut off from the rest.
+        # Returns the cells of those pieces, or None past FLOOD_LIMIT.
+        groups = list(range(len(starts)))
+
+        def find(index):
+            while groups[index] != index:
+                index = groups[index]
+            return index
+
+        owner = {cell: index for index, cell in enumerate(starts)}
+        frontiers = [deque([cell]) for cell in starts]
+        closed = set()
+        while True:
+            live = {find(index) for index in range(len(starts))} - closed
+            if len(live) <= 1:
+                break
+            if len(owner) > FLOOD_LIMIT:
+                return None
+            for index, frontier in enumerate(frontiers):
+                if not frontier:
+                    continue
+                cx, cy = frontier.popleft()
+                for cell in self._free_neighbours(cx, cy):
+                    other = owner.get(cell)
+                    if other is None:
+                        owner[cell] = index
+                        frontier.append(cell)
+                    elif find(other) != find(index):
+                        groups[find(other)] = find(index)
+            for root in live:
+                if find(root) == root and not any(frontiers[i] for i in range(len(starts)) if find(i) == root):
+                    closed.add(root)
+
+        if not live:
+            # Every flood ran dry, so one of the pieces keeps the old label.
+            closed.discard(min(closed))
+        pieces = {}
+        for cell, index in owner.items():
+            if find(index) in closed:
+                pieces.setdefault(find(index), []).append(cell)
+        return list(pieces.values())
+
+    def _open(self, x, y):
+        self.walls[y, x] = False
+        around = {int(self.labels[ny, nx]) for nx, ny in self._free_neighbours(x, y)}
+        if not around:
+            self.labels[y, x] = self.next_label
+            self.next_label += 1
+            return
+        keep = min(around)
+        self.labels[y, x] = keep
+        if len(around) > 1:
+            self.labels[np.isin(self.labels, list(around - {keep}))] = keep
+
+    def _close(self, x, y):
+        old = int(self.labels[y, x])
+        self.walls[y, x] = True
+        self.labels[y, x] = 0
+        starts = self._ring_groups(x, y)
+        if len(starts) <= 1:
+            return
+
+        pieces = self._flood_pieces(starts)
+        if pieces is not None:
+            for cells in pieces:
+                xs, ys = zip(*cells)
+                self.labels[ys, xs] = self.next_label
+                self.next_label += 1
+            return
+
+        # Too large to flood: relabel the whole component at once.
+        self.relabels += 1
+        region = self.labels == old
+        pieces = label_components(~region)
+        count = int(pieces.max())
+        if count > 1:
+            self.labels[region] = np.where(pieces[region] == 1, old, pieces[region] + self.next_label - 2)
+            self.next_label += count - 1
+
+    def update_cells(self, changes):
+        # changes: iterable of ((x, y), is_wall), applied in order.
+        for (x, y), is_wall in changes:
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                continue
+            if bool(self.walls[y, x]) == bool(is_wall):
+                continue
+            if is_wall:
+                self._close(x, y)
+            else:
+                self._open(x, y)
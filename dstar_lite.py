@@ -0,0 +1,168 @@
+import heapq
+import time
+
+import numpy as np
+
+from solvers import DIAGONAL_COST, DIRECTIONS, SolveResult, SolveStats, _as_walls, _pad_walls
+
+
+class DStarLite:
+    # Incremental planner that keeps its g/rhs values between edits. It is
+    # rooted at the start, so g is the cost from the start and the goal plays
+    # the role D* Lite normally gives the moving robot: moving it only bumps
+    # km instead of invalidating the queue. Changing the start needs a new
+    # planner.
+    def __init__(self, walls, start, goal):
+        walls = _as_walls(walls)
+        height, width = walls.shape
+        self.shape = walls.shape
+        self.stride = width + 2
+        self.start = start
+        self.goal = goal
+
+        size = self.stride * (height + 2)
+        self.blocked_array = _pad_walls(walls).ravel()
+        self.g_array = np.full(size, np.inf)
+        self.rhs_array = np.full(size, np.inf)
+        self.blocked = memoryview(self.blocked_array)
+        self.g = memoryview(self.g_array)
+        self.rhs = memoryview(self.rhs_array)
+
+        self.moves = [(dy * self.stride + dx, DIAGONAL_COST if dx and dy else 1.0) for dx, dy in DIRECTIONS]
+        self.km = 0.0
+        self.start_id = self._id(start)
+        self.rhs[self.start_id] = 0.0
+        self.open_set = [(self._key(self.start_id), self.start_id)]
+        self.pending = set()
+
+    def _id(self, cell):
+        return (cell[1] + 1) * self.stride + cell[0] + 1
+
+    def _cell(self, cell_id):
+        return cell_id % self.stride - 1, cell_id // self.stride - 1
+
+    def _heuristic(self, cell_id):
+        dy, dx = divmod(cell_id, self.stride)
+        dx -= self.goal[0] + 1
+        dy -= self.goal[1] + 1
+        dx = -dx if dx < 0 else dx
+        dy = -dy if dy < 0 else dy
+        return dx + (DIAGONAL_COST - 1) * dy if dx > dy else dy + (DIAGONAL_COST - 1) * dx
+
+    def _key(self, cell_id):
+        g, rhs = self.g[cell_id], self.rhs[cell_id]
+        best = g if g < rhs else rhs
+        return (best + self._heuristic(cell_id) + self.km, best)
+
+    def _update(self, cell_id):
+        g, rhs, blocked = self.g, self.rhs, self.blocked
+        if cell_id == self.start_id:
+            rhs[cell_id] = float("inf") if blocked[cell_id] else 0.0
+        else:
+            best = float("inf")
+            if not blocked[cell_id]:
+                for offset, cost in self.moves:
+                    neighbor = cell_id + offset
+                    if not blocked[neighbor] and g[neighbor] + cost < best:
+                        best = g[neighbor] + cost
+            rhs[cell_id] = best
+        # Entries are never removed from the heap; a cell that has become
+        # consistent is skipped when it surfaces.
+        if g[cell_id] != rhs[cell_id]:
+            heapq.heappush(self.open_set, (self._key(cell_id), cell_id))
+
+    def update_cells(self, changes):
+        # changes: iterable of ((x, y), is_wall). Only records the edits;
+        # replan() repairs the affected part of the search.
+        height, width = self.shape
+        for (x, y), is_wall in changes:
+            if not (0 <= x < width and 0 <= y < height):
+                continue
+            cell_id = self._id((x, y))
+            if bool(self.blocked[cell_id]) != bool(is_wall):
+                self.blocked[cell_id] = bool(is_wall)
+                self.pending.add(cell_id)
+
+    def move_goal(self, goal):
+        old = self._heuristic(self._id(goal))
+        self.goal = goal
+        self.km += old
+
+    def replan(self, observer=None):
+        stats = SolveStats()
+        started = time.perf_counter()
+        g, rhs = self.g, self.rhs
+
+        for cell_id in self.pending:
+            self._update(cell_id)
+            for offset, _ in self.moves:
+                neighbor = cell_id + offset
+                if not self.blocked[neighbor]:
+                    self._update(neighbor)
+        self.pending = set()
+
+        goal_id = self._id(self.goal)
+        open_set = self.open_set
+        order = []
+        while open_set:
+            key, current = open_set[0]
+            if g[current] == rhs[current]:
+                heapq.heappop(open_set)
+                continue
+            # Keys equal up to rounding still get expanded; otherwise an
+            # underconsistent cell tied with the goal can be left behind.
+            if rhs[goal_id] == g[goal_id] and key[0] > g[goal_id] + self.km + 1e-9:
+                break
+
+            heapq.heappop(open_set)
+            new_key = self._key(current)
+            if key < new_key:
+                heapq.heappush(open_set, (new_key, current))
+                continue
+
+            stats.expansions += 1
+            order.append(self._cell(current))
+            if g[current] > rhs[current]:
+                g[current] = rhs[current]
+                for offset, cost in self.moves:
+                    neighbor = current + offset
+                    if not self.blocked[neighbor] and neighbor != self.start_id and g[current] + cost < rhs[neighbor]:
+                        rhs[neighbor] = g[current] + cost
+                        heapq.heappush(open_set, (self._key(neighbor), neighbor))
+            else:
+                g[current] = float("inf")
+                self._update(current)
+                for offset, _ in self.moves:
+                    neighbor = current + offset
+                    if not self.blocked[neighbor]:
+                        self._update(neighbor)
+
+        if observer is not None and order:
+            observer("visit", order)
+        path = self.path()
+        if observer is not None and path:
+            observer("path", path)
+        stats.elapsed = time.perf_counter() - started
+        return SolveResult("D* Lite", bool(path), path, order, stats)
+
+    def path(self):
+        # Walks back from the goal along the cheapest predecessor each step.
+        goal_id = self._id(self.goal)
+        g = self.g
+        if self.blocked[goal_id] or g[goal_id] == float("inf"):
+            return []
+        path = [goal_id]
+        current = goal_id
+        while current != self.start_id and len(path) <= len(g):
+            best, best_cost = None, float("inf")
+            for offset, cost in self.moves:
+                neighbor = current + offset
+                if not self.blocked[neighbor] and g[neighbor] + cost < best_cost:
+                    best, best_cost = neighbor, g[neighbor] + cost
+            if best is None:
+                return []
+            current = best
+            path.append(current)
+        if current != self.start_id:
+            return []
+        return [self._cell(cell_id) for cell_id in reversed(path)]
@@ -0,0 +1,299 @@
+import heapq
+import time
+
+import numpy as np
+
+import solvers
+from solvers import DIAGONAL_COST, DIRECTIONS, SolveResult, SolveStats, octile
+
+# Entrances at least this long get a transition at each end instead of one
+# in the middle, as in the original HPA* paper.
+LONG_ENTRANCE = 6
+
+MOVES = [(dx, dy, DIAGONAL_COST if dx and dy else 1.0) for dx, dy in DIRECTIONS]
+
+
+class HierarchicalMap:
+    # HPA* over a wall mask. The map is cut into cluster_size x cluster_size
+    # clusters; cells where a path can cross from one cluster into the next
+    # become abstract nodes ("transitions"), joined by inter-cluster edges
+    # across the border and by intra-cluster edges carrying the exact
+    # shortest cost inside the cluster. Queries run A* on that small graph
+    # and only turn the abstract hops into cells when asked.
+    def __init__(self, walls, cluster_size=16):
+        self.walls = np.array(walls, dtype=bool)
+        self.height, self.width = self.walls.shape
+        self.cluster_size = cluster_size
+        self.columns = -(-self.width // cluster_size)
+        self.rows = -(-self.height // cluster_size)
+
+        self.transitions = {}  # border key -> [(cell_a, cell_b, cost)]
+        self.inter = {}        # cell -> {cell across a border: cost}
+        self.nodes = {}        # cluster -> set of transition cells inside it
+        self.intra = {}        # cluster -> {cell: {cell: cost}}
+        self.segments = {}     # (cell, cell) -> refined cells, filled lazily
+
+        clusters = {(cx, cy) for cx in range(self.columns) for cy in range(self.rows)}
+        self._rebuild(clusters)
+
+    def cluster_of(self, cell):
+        return cell[0] // self.cluster_size, cell[1] // self.cluster_size
+
+    def bounds(self, cluster):
+        x0 = cluster[0] * self.cluster_size
+        y0 = cluster[1] * self.cluster_size
+        return x0, y0, min(x0 + self.cluster_size, self.width), min(y0 + self.cluster_size, self.height)
+
+    def _free(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and not self.walls[y, x]
+
+    def _borders_of(self, cluster):
+        cx, cy = cluster
+        keys = [("v", cx, cy), ("v", cx - 1, cy), ("h", cx, cy), ("h", cx, cy - 1),
+                ("d", cx, cy), ("d", cx - 1, cy - 1), ("a", cx - 1, cy), ("a", cx, cy - 1)]
+        return [key for key in keys if 0 <= key[1] < self.columns and 0 <= key[2] < self.rows]
+
+    def _border_transitions(self, key):
+        kind, cx, cy = key
+        size = self.cluster_size
+        found = []
+
+        if kind in ("d", "a"):
+            # Single diagonal step across the corner shared by four clusters.
+            x, y = (cx + 1) * size - 1, (cy + 1) * size - 1
+            a, b = ((x, y), (x + 1, y + 1)) if kind == "d" else ((x + 1, y), (x, y + 1))
+            if self._free(*a) and self._free(*b):
+                found.append((a, b, DIAGONAL_COST))
+            return found
+
+        if kind == "v":
+            if cx + 1 >= self.columns:
+                return found
+            x0, y0, x1, y1 = self.bounds((cx, cy))
+            pair = lambda i: ((x1 - 1, i), (x1, i))
+            span = range(y0, y1)
+        else:
+            if cy + 1 >= self.rows:
+                return found
+            x0, y0, x1, y1 = self.bounds((cx, cy))
+            pair = lambda i: ((i, y1 - 1), (i, y1))
+            span = range(x0, x1)
+
+        def crossing(i):
+            a, b = pair(i)
+            return self._free(*a) and self._free(*b)
+
+        # Runs of straight crossings become one or two transitions.
+        run = []
+        for i in list(span) + [None]:
+            if i is not None and crossing(i):
+                run.append(i)
+                continue
+            if run:
+                picks = [run[0], run[-1]] if len(run) >= LONG_ENTRANCE else [run[len(run) // 2]]
+                for pick in picks:
+                    a, b = pair(pick)
+                    found.append((a, b, 1.0))
+                run = []
+
+        # A diagonal crossing only matters when neither straight detour
+        # (through its own side's straight partner) exists.
+        for i in span:
+            for j in (i - 1, i + 1):
+                if j not in span:
+                    continue
+                a, _ = pair(i)
+                _, b = pair(j)
+                if (self._free(*a) and self._free(*b) and
+                        not self._free(*pair(i)[1]) and not self._free(*pair(j)[0])):
+                    found.append((a, b, DIAGONAL_COST))
+        return found
+
+    def _cluster_distances(self, cluster, sources):
+        # Exact in-cluster octile distances from each source at once: a
+        # (sources, h, w) array relaxed against its eight shifts until it
+        # stops changing.
+        x0, y0, x1, y1 = self.bounds(cluster)
+        height, width = y1 - y0, x1 - x0
+        blocked = self.walls[y0:y1, x0:x1]
+
+        distances = np.full((len(sources), height + 2, width + 2), np.inf)
+        for index, (sx, sy) in enumerate(sources):
+            distances[index, sy - y0 + 1, sx - x0 + 1] = 0.0
+
+        while True:
+            inner = distances[:, 1:-1, 1:-1]
+            best = inner.copy()
+            for dx, dy, cost in MOVES:
+                np.minimum(best, distances[:, 1 + dy:height + 1 + dy, 1 + dx:width + 1 + dx] + cost, out=best)
+            best[:, blocked] = np.inf
+            if np.array_equal(best, inner):
+                return inner
+            distances[:, 1:-1, 1:-1] = best
+
+    def _connect(self, cluster, cell, targets):
+        # Costs from cell to every target inside the same cluster.
+        if not targets:
+            return {}
+        x0, y0, _, _ = self.bounds(cluster)
+        distances = self._cluster_distances(cluster, [cell])[0]
+        costs = {}
+        for tx, ty in targets:
+            cost = distances[ty - y0, tx - x0]
+            if cost != np.inf and (tx, ty) != cell:
+                costs[tx, ty] = float(cost)
+        return costs
+
+    def _rebuild(self, clusters):
+        borders = set()
+        for cluster in clusters:
+            borders.update(self._borders_of(cluster))
+
+        touched = set()
+        for key in borders:
+            for a, b, _ in self.transitions.pop(key, []):
+                for cell, other in ((a, b), (b, a)):
+                    edges = self.inter.get(cell, {})
+                    edges.pop(other, None)
+                    if not edges:
+                        self.inter.pop(cell, None)
+            for a, b, cost in self._border_transitions(key):
+                self.inter.setdefault(a, {})[b] = cost
+                self.inter.setdefault(b, {})[a] = cost
+                self.transitions.setdefault(key, []).append((a, b, cost))
+
+            kind, cx, cy = key
+            if kind == "v":
+                touched.update({(cx, cy), (cx + 1, cy)})
+            elif kind == "h":
+                touched.update({(cx, cy), (cx, cy + 1)})
+            else:
+                touched.update({(cx, cy), (cx + 1, cy + 1), (cx + 1, cy), (cx, cy + 1)})
+        touched = {c for c in touched if 0 <= c[0] < self.columns and 0 <= c[1] < self.rows}
+
+        for cluster in touched:
+            x0, y0, _, _ = self.bounds(cluster)
+            cells = sorted({cell for key in self._borders_of(cluster)
+                            for pair in self.transitions.get(key, ()) for cell in pair[:2]
+                            if self.cluster_of(cell) == cluster})
+            self.nodes[cluster] = set(cells)
+            edges = {cell: {} for cell in cells}
+            if cells:
+                distances = self._cluster_distances(cluster, cells)
+                for index, cell in enumerate(cells):
+                    for other in cells[index + 1:]:
+                        cost = distances[index, other[1] - y0, other[0] - x0]
+                        if cost != np.inf:
+                            edges[cell][other] = float(cost)
+                            edges[other][cell] = float(cost)
+            self.intra[cluster] = edges
+
+        self.segments = {pair: cells for pair, cells in self.segments.items()
+                         if self.cluster_of(pair[0]) not in touched}
+
+    def update_cells(self, changes):
+        # changes: iterable of ((x, y), is_wall). Only the clusters holding
+        # those cells, plus the neighbours sharing their borders, are redone.
+        clusters = set()
+        for (x, y), is_wall in changes:
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                continue
+            if bool(self.walls[y, x]) != bool(is_wall):
+                self.walls[y, x] = bool(is_wall)
+                clusters.add(self.cluster_of((x, y)))
+        if clusters:
+            self._rebuild(clusters)
+        return clusters
+
+    def _abstract_search(self, start, goal, stats):
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+        start_edges = self._connect(start_cluster, start, self.nodes.get(start_cluster, set()) | {goal}
+                                    if start_cluster == goal_cluster else self.nodes.get(start_cluster, set()))
+        goal_edges = self._connect(goal_cluster, goal, self.nodes.get(goal_cluster, set()))
+
+        def neighbors(cell):
+            if cell == start:
+                yield from start_edges.items()
+                yield from self.inter.get(start, {}).items()
+                return
+            yield from self.inter.get(cell, {}).items()
+            yield from self.intra[self.cluster_of(cell)].get(cell, {}).items()
+            if cell in goal_edges:
+                yield goal, goal_edges[cell]
+
+        g_scores = {start: 0.0}
+        parents = {start: None}
+        h = octile(*start, *goal)
+        open_set = [(h, h, start)]
+        closed = set()
+        order = []
+
+        while open_set:
+            _, _, current = heapq.heappop(open_set)
+            if current in closed:
+                continue
+            closed.add(current)
+            order.append(current)
+            stats.expansions += 1
+
+            if current == goal:
+                waypoints = []
+                while current is not None:
+                    waypoints.append(current)
+                    current = parents[current]
+                return waypoints[::-1], g_scores[goal], order
+
+            for neighbor, cost in neighbors(current):
+                if neighbor in closed:
+                    continue
+                tentative_g = g_scores[current] + cost
+                if tentative_g < g_scores.get(neighbor, np.inf):
+                    g_scores[neighbor] = tentative_g
+                    parents[neighbor] = current
+                    h = octile(*neighbor, *goal)
+                    heapq.heappush(open_set, (tentative_g + h, h, neighbor))
+
+        return [], None, order
+
+    def _segment(self, a, b):
+        if max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1 and b in self.inter.get(a, {}):
+            return [a, b]
+        if (a, b) in self.segments:
+            return self.segments[a, b]
+
+        cluster = self.cluster_of(a)
+        x0, y0, x1, y1 = self.bounds(cluster)
+        local = solvers.a_star(self.walls[y0:y1, x0:x1], (a[0] - x0, a[1] - y0), (b[0] - x0, b[1] - y0))
+        cells = [(x + x0, y + y0) for x, y in local.path]
+        if a in self.inter and b in self.inter:
+            self.segments[a, b] = cells
+        return cells
+
+    def refine(self, waypoints):
+        # Lazily turns abstract hops into cells, one hop at a time.
+        for a, b in zip(waypoints, waypoints[1:]):
+            yield self._segment(a, b)
+
+    def find_path(self, start, goal, refine=True):
+        # With refine=False the path is just the abstract nodes; its length
+        # is still the true cost, which the abstract search already knows.
+        stats = SolveStats()
+        started = time.perf_counter()
+        if not self._free(*start) or not self._free(*goal):
+            stats.elapsed = time.perf_counter() - started
+            return SolveResult("HPA*", False, [], [], stats)
+
+        if start == goal:
+            waypoints, cost, order = [start], 0.0, [start]
+        else:
+            waypoints, cost, order = self._abstract_search(start, goal, stats)
+
+        path = waypoints
+        if refine and waypoints:
+            path = [start]
+            for segment in self.refine(waypoints):
+                path.extend(segment[1:])
+
+        stats.elapsed = time.perf_counter() - started
+        return SolveResult("HPA*", bool(waypoints), path, order, stats, waypoints, cost)
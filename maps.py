@@ -0,0 +1,143 @@
+import numpy as np
+
+def make_rng(seed=None):
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def parse_size(text):
+    # "WIDTHxHEIGHT" from the command line, as (width, height).
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def generate_walls(width, height, density=0.3, rng=None):
+    rng = make_rng(rng)
+    walls = np.ones((height, width), dtype=bool)
+    walls[1:-1, 1:-1] = rng.random((height - 2, width - 2)) < density
+    return walls
+
+
+def save_walls(path, walls):
+    # Wall masks are stored as plain .npy files, one byte per cell, so
+    # load_walls can memory-map them back without reading them in.
+    walls = np.asarray(walls, dtype=bool)
+    stored = np.lib.format.open_memmap(path, mode="w+", dtype=bool, shape=walls.shape)
+    stored[:] = walls
+    stored.flush()
+    return path
+
+
+def load_walls(path, mmap_mode="r"):
+    # Opening is O(1) whatever the map size; pages are only read from disk
+    # as the solvers touch them. mmap_mode=None loads it fully instead, and
+    # "r+" writes edits straight back to the file.
+    walls = np.load(path, mmap_mode=mmap_mode)
+    if walls.dtype != bool or walls.ndim != 2:
+        raise ValueError(f"{path} is not a 2D wall mask")
+    return walls
+
+
+def generate_walls_file(path, width, height, density=0.3, rng=None, chunk_rows=1024):
+    # generate_walls for maps too big to build in memory: rows are drawn and
+    # written straight into the memory-mapped file a chunk at a time.
+    rng = make_rng(rng)
+    walls = np.lib.format.open_memmap(path, mode="w+", dtype=bool, shape=(height, width))
+    for top in range(0, height, chunk_rows):
+        bottom = min(top + chunk_rows, height)
+        chunk = rng.random((bottom - top, width)) < density
+        chunk[:, 0] = chunk[:, -1] = True
+        walls[top:bottom] = chunk
+    walls[0, :] = walls[-1, :] = True
+    walls.flush()
+    return walls
+
+
+def label_components(walls):
+    # Union-find done with whole-array operations. Every horizontal run of
+    # free cells starts out as one set (rooted at its leftmost cell), then
+    # runs touching across rows, diagonals included, are merged by hooking
+    # the larger root onto the smaller and pointer jumping until every cell
+    # points straight at its root. Components are numbered 1..n, walls are 0.
+    walls = np.asarray(walls, dtype=bool)
+    height, width = walls.shape
+    free = ~walls
+    size = height * width
+    ids = np.arange(size).reshape(height, width)
+
+    run_start = free.copy()
+    run_start[:, 1:] &= walls[:, :-1]
+    parent = np.maximum.accumulate(np.where(run_start, ids, 0), axis=1)
+
+    upper_runs, lower_runs = [], []
+    for dx in (-1, 0, 1):
+        upper = (slice(0, height - 1), slice(max(0, -dx), width - max(0, dx)))
+        lower = (slice(1, height), slice(max(0, dx), width - max(0, -dx)))
+        touching = free[upper] & free[lower]
+        a = parent[upper][touching]
+        b = parent[lower][touching]
+        # Neighbouring cells of the same two runs come out back to back.
+        fresh = np.ones(len(a), dtype=bool)
+        fresh[1:] = (a[1:] != a[:-1]) | (b[1:] != b[:-1])
+        upper_runs.append(a[fresh])
+        lower_runs.append(b[fresh])
+
+    u = np.concatenate(upper_runs)
+    v = np.concatenate(lower_runs)
+    parent = parent.ravel()
+
+    while len(u):
+        root_u = parent[u]
+        root_v = parent[v]
+        pending = root_u != root_v
+        u, v = u[pending], v[pending]
+        if not len(u):
+            break
+        root_u, root_v = root_u[pending], root_v[pending]
+        np.minimum.at(parent, np.maximum(root_u, root_v), np.minimum(root_u, root_v))
+
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+    is_root = free.ravel() & (parent == ids.ravel())
+    numbering = np.cumsum(is_root, dtype=np.int32)
+    return np.where(free, numbering[parent].reshape(height, width), 0)
+
+
+def place_start_and_end(walls, rng=None, min_distance=30, connected=False):
+    # Start and end are drawn from the free cells directly, so this never
+    # spins however dense or small the map is. With connected=True both come
+    # from the same 8-connected component. If nothing is min_distance away
+    # (Manhattan), the farthest candidates are used instead.
+    rng = make_rng(rng)
+    walls = np.asarray(walls, dtype=bool)
+    width = walls.shape[1]
+
+    free = np.flatnonzero(~walls)
+    if len(free) < 2:
+        raise ValueError("need at least two free cells to place start and end")
+
+    if connected:
+        labels = label_components(walls).ravel()
+        sizes = np.bincount(labels[free])
+        free = free[sizes[labels[free]] > 1]
+        if len(free) == 0:
+            raise ValueError("no two free cells are connected")
+
+    start_id = int(rng.choice(free))
+    candidates = free[free != start_id]
+    if connected:
+        candidates = candidates[labels[candidates] == labels[start_id]]
+
+    sx, sy = start_id % width, start_id // width
+    distance = np.abs(candidates % width - sx) + np.abs(candidates // width - sy)
+    far = candidates[distance >= min_distance]
+    if len(far) == 0:
+        far = candidates[distance == distance.max()]
+
+    end_id = int(rng.choice(far))
+    return (sx, sy), (end_id % width, end_id // width)
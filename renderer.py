@@ -0,0 +1,73 @@
+import numpy as np
+import pygame
+
+GRID_LINE_COLOR = (200, 200, 200)
+TRANSPARENT_KEY = (255, 0, 255)
+
+
+class GridRenderer:
+    def __init__(self, width, height, cell_size, colors, line_color=GRID_LINE_COLOR):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.line_color = line_color
+        self.colors = colors
+
+        self.palette = np.zeros((max(colors) + 1, 3), dtype=np.uint8)
+        for state, color in colors.items():
+            self.palette[state] = color
+
+        self.dirty = set()
+        self.needs_full_redraw = True
+        self._lines = None
+
+    def _grid_lines(self):
+        # Built once: every cell's 1px outline on a colour-keyed surface, so
+        # a full redraw is one scaled blit of the cell colours plus this.
+        if self._lines is None:
+            size = self.cell_size
+            xs = np.arange(self.width * size) % size
+            ys = np.arange(self.height * size) % size
+            on_x = (xs == 0) | (xs == size - 1)
+            on_y = (ys == 0) | (ys == size - 1)
+            mask = on_x[:, None] | on_y[None, :]
+
+            pixels = np.empty(mask.shape + (3,), dtype=np.uint8)
+            pixels[:] = TRANSPARENT_KEY
+            pixels[mask] = self.line_color
+            self._lines = pygame.surfarray.make_surface(pixels)
+            self._lines.set_colorkey(TRANSPARENT_KEY)
+        return self._lines
+
+    def mark_dirty(self, cells):
+        self.dirty.update(cells)
+
+    def invalidate(self):
+        self.needs_full_redraw = True
+
+    def draw(self, screen, states):
+        cells = pygame.surfarray.make_surface(self.palette[states].swapaxes(0, 1))
+        size = (self.width * self.cell_size, self.height * self.cell_size)
+        screen.blit(pygame.transform.scale(cells, size), (0, 0))
+        screen.blit(self._grid_lines(), (0, 0))
+
+        self.dirty.clear()
+        self.needs_full_redraw = False
+        return [pygame.Rect((0, 0), size)]
+
+    def flush(self, screen, states):
+        # Repaints only what changed since the last flush and returns the
+        # rects to hand to pygame.display.update().
+        if self.needs_full_redraw:
+            return self.draw(screen, states)
+
+        rects = []
+        size = self.cell_size
+        for x, y in self.dirty:
+            rect = pygame.Rect(x * size, y * size, size, size)
+            pygame.draw.rect(screen, self.colors[states[y, x]], rect)
+            pygame.draw.rect(screen, self.line_color, rect, 1)
+            rects.append(rect)
+
+        self.dirty.clear()
+        return rects
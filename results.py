@@ -0,0 +1,123 @@
+import argparse
+import os
+import sqlite3
+from datetime import datetime
+
+DEFAULT_OUTPUT_DIR = os.environ.get("PATHFINDING_OUTPUT_DIR", "output")
+
+COLUMNS = ["playground", "recorded_at", "algorithm", "found",
+           "path_length", "expansions", "elapsed", "image"]
+
+
+class ResultStore:
+    # Append-only SQLite results sink. Rows are buffered and written in one
+    # transaction every batch_size records (and on flush/close), so saving a
+    # run costs the same no matter how much history the store holds.
+    def __init__(self, output_dir=DEFAULT_OUTPUT_DIR, batch_size=20):
+        self.output_dir = output_dir
+        self.image_folder = os.path.join(output_dir, "playground_images")
+        self.batch_size = batch_size
+        self.pending = []
+
+        os.makedirs(self.image_folder, exist_ok=True)
+        self.db_path = os.path.join(output_dir, "results.sqlite")
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "id INTEGER PRIMARY KEY, playground TEXT, recorded_at TEXT, algorithm TEXT, "
+            "found INTEGER, path_length REAL, expansions INTEGER, elapsed REAL, image TEXT)"
+        )
+        self.connection.commit()
+
+    def image_path(self, playground_name, when=None):
+        when = when or datetime.now()
+        return os.path.join(self.image_folder, f"{playground_name}_{when:%Y%m%d_%H%M%S_%f}.png")
+
+    def record(self, playground_name, algorithm, result=None, image=None, when=None):
+        when = when or datetime.now()
+        stats = result.stats if result is not None else None
+        self.pending.append((
+            playground_name,
+            when.isoformat(timespec="seconds"),
+            algorithm,
+            int(result.found) if result is not None else None,
+            result.path_length if result is not None else None,
+            stats.expansions if stats is not None else None,
+            stats.elapsed if stats is not None else None,
+            image,
+        ))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                self.pending,
+            )
+        self.pending = []
+
+    def rows(self):
+        self.flush()
+        cursor = self.connection.execute(f"SELECT {', '.join(COLUMNS)} FROM runs ORDER BY id")
+        return [dict(zip(COLUMNS, row)) for row in cursor]
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def export_excel(self, excel_file=None):
+        # Builds the whole workbook in one go from the store. openpyxl is only
+        # needed here, not for recording results.
+        from openpyxl import Workbook
+        from openpyxl.drawing.image import Image as ExcelImage
+
+        excel_file = excel_file or os.path.join(self.output_dir, "playground_metadata.xlsx")
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Playground Name", "Date", "Time", "Best Algorithm", "Image",
+                   "Path Length", "Expansions", "Seconds"])
+
+        next_row = 2
+        for row in self.rows():
+            recorded = datetime.fromisoformat(row["recorded_at"])
+            ws.cell(row=next_row, column=1, value=row["playground"])
+            ws.cell(row=next_row, column=2, value=recorded.strftime("%Y-%m-%d"))
+            ws.cell(row=next_row, column=3, value=recorded.strftime("%H:%M:%S"))
+            ws.cell(row=next_row, column=4, value=row["algorithm"])
+            ws.cell(row=next_row, column=6, value=row["path_length"])
+            ws.cell(row=next_row, column=7, value=row["expansions"])
+            ws.cell(row=next_row, column=8, value=row["elapsed"])
+
+            if row["image"] and os.path.exists(row["image"]):
+                img = ExcelImage(row["image"])
+                img.anchor = f"E{next_row}"
+                img.width = 160
+                img.height = 120
+                ws.add_image(img)
+                # Leave room for the 120px thumbnail before the next row.
+                next_row += 7
+            else:
+                next_row += 1
+
+        wb.save(excel_file)
+        return excel_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export stored playground results to Excel.")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--excel", help="workbook path (defaults to <output-dir>/playground_metadata.xlsx)")
+    args = parser.parse_args()
+
+    store = ResultStore(args.output_dir)
+    try:
+        print(f"Results exported to '{store.export_excel(args.excel)}'")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
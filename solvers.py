@@ -0,0 +1,1224 @@
+import copy
+import cProfile
+import heapq
+import pstats
+import random
+import time
+from collections import deque
+
+import numpy as np
+
+from collision import CollisionChecker, interpolate_path
+from spatial import BucketGrid
+
+# Same neighbour order the pygame Grid has always used, so headless runs
+# visit cells in exactly the order the visualisation shows.
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0),
+              (1, 1), (-1, -1), (1, -1), (-1, 1)]
+DIAGONAL_COST = 2 ** 0.5
+
+
+class SolveStats:
+    # The grid searches keep their counters in locals inside the hot loop
+    # and write them here through _count_open once they return, so
+    # collecting them costs next to nothing. IB-RRT* counts here directly;
+    # each of its steps does far more work than one attribute update.
+    def __init__(self):
+        self.expansions = 0
+        self.elapsed = 0.0
+        # (seconds since start, path cost) each time an anytime solver improves.
+        self.cost_history = []
+        self.heap_pushes = 0
+        self.heap_pops = 0
+        self.stale_pops = 0
+        self.peak_open = 0
+        self.collision_checks = 0
+        # Part of elapsed spent inside the observer, i.e. drawing.
+        self.render_time = 0.0
+        # pstats.Stats for runs made with solve(..., profile=...).
+        self.profile = None
+
+    @property
+    def search_time(self):
+        return self.elapsed - self.render_time
+
+    def as_dict(self):
+        return {
+            "expansions": self.expansions,
+            "elapsed": self.elapsed,
+            "search_time": self.search_time,
+            "render_time": self.render_time,
+            "heap_pushes": self.heap_pushes,
+            "heap_pops": self.heap_pops,
+            "stale_pops": self.stale_pops,
+            "peak_open": self.peak_open,
+            "collision_checks": self.collision_checks,
+        }
+
+
+class SolveResult:
+    def __init__(self, algorithm, found, path, visited, stats, waypoints=None, cost=None):
+        self.algorithm = algorithm
+        self.found = found
+        self.path = path
+        self.visited = visited
+        self.stats = stats
+        # Corners of an any-angle route. path then holds the cells its
+        # straight legs cross, and the length is measured along the legs.
+        self.waypoints = waypoints
+        # Cost of the route when the solver already knows it, e.g. HPA*,
+        # whose unrefined path is only the abstract nodes it passes.
+        self.cost = cost
+
+    @property
+    def path_length(self):
+        if self.cost is not None:
+            return self.cost
+        points = self.waypoints or self.path
+        length = 0.0
+        for (x1, y1), (x2, y2) in zip(points, points[1:]):
+            length += ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5
+        return length
+
+    def __bool__(self):
+        return self.found
+
+    def __repr__(self):
+        return (f"SolveResult({self.algorithm!r}, found={self.found}, "
+                f"path={len(self.path)} cells, visited={len(self.visited)} cells)")
+
+
+# Observers are plain callables taking (event, cells). A solver emits
+# "visit" with the cells it just marked as visited and "path" once with the
+# final path. Passing observer=None runs at full speed with no callbacks.
+def _as_walls(walls):
+    return np.asarray(walls, dtype=bool)
+
+
+def _finish(algorithm, found, path, visited, stats, started, observer):
+    stats.elapsed = time.perf_counter() - started
+    if found and observer is not None:
+        observer("path", path)
+    return SolveResult(algorithm, found, path, visited, stats)
+
+
+def _count_open(stats, expansions, pushes, pops, stale, peak):
+    stats.expansions = expansions
+    stats.heap_pushes = pushes
+    stats.heap_pops = pops
+    stats.stale_pops = stale
+    stats.peak_open = peak
+
+
+def _pad_walls(walls):
+    height, width = walls.shape
+    padded = np.ones((height + 2, width + 2), dtype=bool)
+    padded[1:-1, 1:-1] = walls
+    return padded
+
+
+def _reconstruct(parents, goal, width):
+    path = []
+    current = goal
+    while current != -1:
+        path.append((current % width, current // width))
+        current = int(parents[current])
+    return path[::-1]
+
+
+def _walk_back(parents, cell, stride):
+    # Cells from cell back to its root, over parent links between padded
+    # ids (stride = width + 2); the root's parent is -1.
+    cells = []
+    while cell != -1:
+        cells.append((cell % stride - 1, cell // stride - 1))
+        cell = int(parents[cell])
+    return cells
+
+
+def bfs(walls, start, end, observer=None):
+    walls = _as_walls(walls)
+    height, width = walls.shape
+    stats = SolveStats()
+    started = time.perf_counter()
+
+    # Cells are flat ids (y * width + x); each discovered cell remembers its
+    # predecessor so the path is rebuilt once at the goal instead of copied
+    # along with every queue entry.
+    blocked = walls.ravel().copy()
+    parents = np.full(width * height, -1, dtype=np.int32)
+    start_id = start[1] * width + start[0]
+    end_id = end[1] * width + end[0]
+
+    blocked[start_id] = True
+    queue = deque([start_id])
+    order = []
+    peak = 1
+    expansions = 0
+
+    while queue:
+        if len(queue) > peak:
+            peak = len(queue)
+        current = queue.popleft()
+        x, y = current % width, current // width
+        order.append((x, y))
+        expansions += 1
+        if observer is not None:
+            observer("visit", [(x, y)])
+
+        if current == end_id:
+            _count_open(stats, expansions, expansions + len(queue), expansions, 0, peak)
+            path = _reconstruct(parents, current, width)
+            return _finish("BFS", True, path, order, stats, started, observer)
+
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+
+            if 0 <= nx < width and 0 <= ny < height:
+                neighbor = ny * width + nx
+                if not blocked[neighbor]:
+                    blocked[neighbor] = True
+                    parents[neighbor] = current
+                    queue.append(neighbor)
+
+    _count_open(stats, expansions, expansions, expansions, 0, peak)
+    return _finish("BFS", False, [], order, stats, started, observer)
+
+
+def dfs(walls, start, end, observer=None, rng=None):
+    walls = _as_walls(walls)
+    height, width = walls.shape
+    rng = rng or random
+    stats = SolveStats()
+    started = time.perf_counter()
+
+    directions = list(DIRECTIONS)
+    rng.shuffle(directions)
+
+    blocked = walls.ravel().copy()
+    parents = np.full(width * height, -1, dtype=np.int32)
+    start_id = start[1] * width + start[0]
+    end_id = end[1] * width + end[0]
+
+    blocked[start_id] = True
+    # The stack carries the path length alongside the cell, which is all the
+    # direction reshuffling below needs from the old per-entry path copies.
+    stack = [(start_id, 1)]
+    order = []
+    peak = 1
+    expansions = 0
+
+    while stack:
+        if len(stack) > peak:
+            peak = len(stack)
+        current, depth = stack.pop()
+        x, y = current % width, current // width
+        order.append((x, y))
+        expansions += 1
+        if observer is not None:
+            observer("visit", [(x, y)])
+
+        if current == end_id:
+            _count_open(stats, expansions, expansions + len(stack), expansions, 0, peak)
+            path = _reconstruct(parents, current, width)
+            return _finish("DFS", True, path, order, stats, started, observer)
+
+        if depth % 5 == 0:
+            rng.shuffle(directions)
+
+        for dx, dy in directions:
+            nx, ny = x + dx, y + dy
+
+            if 0 <= nx < width and 0 <= ny < height:
+                neighbor = ny * width + nx
+                if not blocked[neighbor]:
+                    blocked[neighbor] = True
+                    parents[neighbor] = current
+                    stack.append((neighbor, depth + 1))
+
+    _count_open(stats, expansions, expansions, expansions, 0, peak)
+    return _finish("DFS", False, [], order, stats, started, observer)
+
+
+def _cells(ids, stride):
+    return list(zip((ids % stride - 1).tolist(), (ids // stride - 1).tolist()))
+
+
+def _grow_frontier(frontier, offsets, open_cells):
+    # One BFS level for the whole frontier at once: every cell shifted by
+    # every neighbour offset, filtered to cells not reached yet and
+    # deduplicated keeping the first discovery, in discovery order. That is
+    # exactly the order a FIFO queue would have found them in.
+    candidates = (frontier[:, None] + offsets[None, :]).ravel()
+    sources = np.repeat(frontier, len(offsets))
+    keep = open_cells[candidates]
+    candidates, sources = candidates[keep], sources[keep]
+
+    _, first = np.unique(candidates, return_index=True)
+    first.sort()
+    return candidates[first], sources[first]
+
+
+def bfs_frontier(walls, start, end, observer=None):
+    # Level-synchronous BFS on NumPy arrays. Returns the same path and visit
+    # order as bfs, but each level costs a handful of array operations
+    # instead of a Python loop over its cells.
+    walls = _as_walls(walls)
+    width = walls.shape[1]
+    stats = SolveStats()
+    started = time.perf_counter()
+
+    stride = width + 2
+    open_cells = ~_pad_walls(walls).ravel()
+    parents = np.full(open_cells.size, -1, dtype=np.int32)
+    offsets = np.array([dy * stride + dx for dx, dy in DIRECTIONS], dtype=np.int64)
+    start_id = (start[1] + 1) * stride + start[0] + 1
+    end_id = (end[1] + 1) * stride + end[0] + 1
+
+    open_cells[start_id] = False
+    frontier = np.array([start_id], dtype=np.int64)
+    levels = []
+    pushed = peak = 1
+    expansions = 0
+
+    while len(frontier):
+        hit = np.flatnonzero(frontier == end_id)
+        if len(hit):
+            # The queue version stops when it pops the goal, part-way
+            # through this level.
+            frontier = frontier[:hit[0] + 1]
+        levels.append(frontier)
+        expansions += len(frontier)
+        if observer is not None:
+            observer("visit", _cells(frontier, stride))
+
+        if len(hit):
+            _count_open(stats, expansions, pushed, expansions, 0, peak)
+            path = _walk_back(parents, end_id, stride)[::-1]
+            order = _cells(np.concatenate(levels), stride)
+            return _finish("BFS-frontier", True, path, order, stats, started, observer)
+
+        frontier, sources = _grow_frontier(frontier, offsets, open_cells)
+        open_cells[frontier] = False
+        parents[frontier] = sources
+        pushed += len(frontier)
+        peak = max(peak, len(frontier))
+
+    _count_open(stats, expansions, pushed, expansions, 0, peak)
+    order = _cells(np.concatenate(levels), stride)
+    return _finish("BFS-frontier", False, [], order, stats, started, observer)
+
+
+def bfs_bidirectional(walls, start, end, observer=None):
+    # Level-synchronous BFS from both ends, always growing the smaller
+    # frontier, until the two searches touch. The meeting cell with the
+    # fewest hops back to the other end gives a hop-optimal path.
+    walls = _as_walls(walls)
+    width = walls.shape[1]
+    stats = SolveStats()
+    started = time.perf_counter()
+
+    stride = width + 2
+    free = ~_pad_walls(walls).ravel()
+    offsets = np.array([dy * stride + dx for dx, dy in DIRECTIONS], dtype=np.int64)
+    start_id = (start[1] + 1) * stride + start[0] + 1
+    end_id = (end[1] + 1) * stride + end[0] + 1
+
+    sides = []
+    for root in (start_id, end_id):
+        side = {
+            "open": free.copy(),
+            "parents": np.full(free.size, -1, dtype=np.int32),
+            "depth": np.full(free.size, -1, dtype=np.int32),
+            "frontier": np.array([root], dtype=np.int64),
+            "level": 0,
+        }
+        side["open"][root] = False
+        side["depth"][root] = 0
+        sides.append(side)
+
+    order = [start]
+    expansions = 1
+    meeting = start_id if start_id == end_id else None
+    peak = 1
+
+    while meeting is None and len(sides[0]["frontier"]) and len(sides[1]["frontier"]):
+        grow, other = sides if len(sides[0]["frontier"]) <= len(sides[1]["frontier"]) else sides[::-1]
+
+        frontier, sources = _grow_frontier(grow["frontier"], offsets, grow["open"])
+        grow["level"] += 1
+        grow["open"][frontier] = False
+        grow["parents"][frontier] = sources
+        grow["depth"][frontier] = grow["level"]
+        grow["frontier"] = frontier
+        peak = max(peak, len(sides[0]["frontier"]) + len(sides[1]["frontier"]))
+
+        cells = _cells(frontier, stride)
+        order.extend(cells)
+        expansions += len(frontier)
+        if observer is not None:
+            observer("visit", cells)
+
+        touching = frontier[other["depth"][frontier] >= 0]
+        if len(touching):
+            meeting = int(touching[np.argmin(other["depth"][touching])])
+
+    _count_open(stats, expansions, expansions, expansions, 0, peak)
+    if meeting is None:
+        return _finish("BFS-bidir", False, [], order, stats, started, observer)
+
+    path = _walk_back(sides[0]["parents"], meeting, stride)[::-1] + _walk_back(sides[1]["parents"], meeting, stride)[1:]
+    return _finish("BFS-bidir", True, path, order, stats, started, observer)
+
+
+def octile(x1, y1, x2, y2):
+    dx = abs(x1 - x2)
+    dy = abs(y1 - y2)
+    return max(dx, dy) + (DIAGONAL_COST - 1) * min(dx, dy)
+
+
+def a_star(walls, start, end, observer=None, costs=None):
+    reached, order, stats, started = _best_first(walls, [start], [end], observer, costs)
+    path = reached.get(tuple(end), [])
+    return _finish("A*", bool(path), path, order, stats, started, observer)
+
+
+def _best_first(walls, sources, goals, observer=None, costs=None, heuristic=True, settle_all=False):
+    # The A* loop behind a_star, dijkstra, nearest_goal and one_to_many.
+    # Every source starts at g = 0, and the search stops at the first goal it
+    # closes, or with settle_all once all of them are closed. Entering a
+    # cell costs the step length times that cell's entry in costs (1 when
+    # costs is None); an infinite cost blocks the cell. Returns
+    # ({goal: path}, visit order, stats, start time).
+    walls = _as_walls(walls)
+    height, width = walls.shape
+    stats = SolveStats()
+    started = time.perf_counter()
+
+    # Work on a copy padded with a ring of walls so neighbours are a fixed
+    # flat offset away and never need a bounds check. The arrays are read
+    # through memoryviews, which index far faster than NumPy scalars do.
+    stride = width + 2
+    size = stride * (height + 2)
+    blocked_grid = _pad_walls(walls)
+
+    # The heuristic is the octile distance to the goals' bounding box,
+    # which is never more than the distance to any goal in it and is the
+    # plain octile distance for a single goal. Every move costs at least its
+    # length times the cheapest open cell, so scaling by that keeps it
+    # admissible.
+    scale = 1.0 if heuristic and goals else 0.0
+    weights = None
+    if costs is not None:
+        costs = np.asarray(costs, dtype=np.float64)
+        if costs.shape != walls.shape:
+            raise ValueError(f"costs shape {costs.shape} does not match walls shape {walls.shape}")
+        if (costs < 0).any():
+            raise ValueError("cell costs must not be negative")
+        weight_grid = np.ones(blocked_grid.shape)
+        weight_grid[1:-1, 1:-1] = costs
+        blocked_grid |= np.isinf(weight_grid)
+        weights = memoryview(weight_grid.ravel())
+        if scale and not blocked_grid.all():
+            scale = float(weight_grid[~blocked_grid].min())
+    # Uniform maps skip the per-move weight lookup.
+    weighted = weights is not None
+    low_x = min((x for x, _ in goals), default=0)
+    high_x = max((x for x, _ in goals), default=0)
+    low_y = min((y for _, y in goals), default=0)
+    high_y = max((y for _, y in goals), default=0)
+
+    blocked = memoryview(blocked_grid.ravel())
+    g_array = np.full(size, np.inf)
+    parent_array = np.full(size, -1, dtype=np.int32)
+    closed_array = np.zeros(size, dtype=bool)
+    g_scores = memoryview(g_array)
+    parents = memoryview(parent_array)
+    closed = memoryview(closed_array)
+
+    moves = [(dy * stride + dx, dx, dy, DIAGONAL_COST if dx and dy else 1.0)
+             for dx, dy in DIRECTIONS]
+    remaining = {(y + 1) * stride + x + 1 for x, y in goals}
+    diagonal_extra = DIAGONAL_COST - 1
+
+    # Heap entries are (f, h, cell). Ties on f go to the cell closer to the
+    # goal, and a cell pushed again with a better g simply leaves its old
+    # entry behind to be skipped once it surfaces.
+    open_set = []
+    for x, y in sources:
+        source_id = (y + 1) * stride + x + 1
+        if not blocked[source_id] and g_scores[source_id] != 0.0:
+            g_scores[source_id] = 0.0
+            hx = low_x - x if x < low_x else (x - high_x if x > high_x else 0)
+            hy = low_y - y if y < low_y else (y - high_y if y > high_y else 0)
+            h = scale * (hx + diagonal_extra * hy if hx > hy else hy + diagonal_extra * hx)
+            open_set.append((h, h, source_id))
+    heapq.heapify(open_set)
+
+    reached = {}
+    order = []
+    inf = float("inf")
+    peak = len(open_set)
+    expansions = 0
+    stale = 0
+
+    while open_set:
+        if len(open_set) > peak:
+            peak = len(open_set)
+        current = heapq.heappop(open_set)[2]
+        if closed[current]:
+            stale += 1
+            continue
+        closed[current] = True
+        expansions += 1
+
+        x, y = current % stride - 1, current // stride - 1
+        if current in remaining:
+            remaining.discard(current)
+            reached[x, y] = _walk_back(parents, current, stride)[::-1]
+            if not settle_all or not remaining:
+                break
+
+        current_g = g_scores[current]
+        for offset, dx, dy, step in moves:
+            neighbor = current + offset
+            if blocked[neighbor] or closed[neighbor]:
+                continue
+
+            tentative_g = current_g + (step * weights[neighbor] if weighted else step)
+            old_g = g_scores[neighbor]
+            if tentative_g < old_g:
+                g_scores[neighbor] = tentative_g
+                parents[neighbor] = current
+                nx, ny = x + dx, y + dy
+                hx = low_x - nx if nx < low_x else (nx - high_x if nx > high_x else 0)
+                hy = low_y - ny if ny < low_y else (ny - high_y if ny > high_y else 0)
+                h = scale * (hx + diagonal_extra * hy if hx > hy else hy + diagonal_extra * hx)
+                heapq.heappush(open_set, (tentative_g + h, h, neighbor))
+
+                if old_g == inf:
+                    order.append((nx, ny))
+                    if observer is not None:
+                        observer("visit", [(nx, ny)])
+
+    _count_open(stats, expansions, expansions + stale + len(open_set), expansions + stale, stale, peak)
+    return reached, order, stats, started
+
+
+def dijkstra(walls, start, end, observer=None, costs=None):
+    reached, order, stats, started = _best_first(walls, [start], [end], observer, costs, heuristic=False)
+    path = reached.get(tuple(end), [])
+    return _finish("Dijkstra", bool(path), path, order, stats, started, observer)
+
+
+def nearest_goal(walls, sources, goals, observer=None, costs=None):
+    # Path from whichever source is closest to whichever goal is closest,
+    # in one search instead of one per pair.
+    reached, order, stats, started = _best_first(walls, sources, goals, observer, costs)
+    path = next(iter(reached.values()), [])
+    return _finish("Nearest-goal", bool(path), path, order, stats, started, observer)
+
+
+def one_to_many(walls, start, targets, observer=None, costs=None):
+    # One Dijkstra pass from start that stops once every target is closed.
+    # Returns {target: SolveResult}; the results share the visit order and
+    # the stats of that single pass.
+    reached, order, stats, started = _best_first(walls, [start], targets, observer, costs,
+                                                 heuristic=False, settle_all=True)
+    stats.elapsed = time.perf_counter() - started
+    results = {}
+    for target in targets:
+        path = reached.get(tuple(target), [])
+        if path and observer is not None:
+            observer("path", path)
+        results[tuple(target)] = SolveResult("Dijkstra", bool(path), path, order, stats)
+    return results
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+def _pruned_directions(blocked, cell, dx, dy, stride):
+    # Jump Point Search neighbour pruning for grids where a diagonal move
+    # only needs its target cell free: the natural directions plus the
+    # forced ones created by walls beside the node.
+    if dx and dy:
+        directions = [(dx, 0), (0, dy), (dx, dy)]
+        if blocked[cell - dx]:
+            directions.append((-dx, dy))
+        if blocked[cell - dy * stride]:
+            directions.append((dx, -dy))
+    elif dx:
+        directions = [(dx, 0)]
+        if blocked[cell + stride]:
+            directions.append((dx, 1))
+        if blocked[cell - stride]:
+            directions.append((dx, -1))
+    else:
+        directions = [(0, dy)]
+        if blocked[cell + 1]:
+            directions.append((1, dy))
+        if blocked[cell - 1]:
+            directions.append((-1, dy))
+    return directions
+
+
+def _expand_jumps(points):
+    # Consecutive jump points are always a straight or diagonal run apart.
+    path = [points[0]]
+    for x2, y2 in points[1:]:
+        x, y = path[-1]
+        dx, dy = _sign(x2 - x), _sign(y2 - y)
+        while (x, y) != (x2, y2):
+            x, y = x + dx, y + dy
+            path.append((x, y))
+    return path
+
+
+def _jump_point_search(name, walls, start, end, observer, successors):
+    # Shared A* over jump points; successors(cell, dx, dy) yields
+    # (jump point, steps, is_diagonal) for a node reached moving (dx, dy).
+    height, width = walls.shape
+    stats = SolveStats()
+    started = time.perf_counter()
+
+    stride = width + 2
+    size = stride * (height + 2)
+    g_array = np.full(size, np.inf)
+    parent_array = np.full(size, -1, dtype=np.int32)
+    closed_array = np.zeros(size, dtype=bool)
+    g_scores = memoryview(g_array)
+    parents = memoryview(parent_array)
+    closed = memoryview(closed_array)
+
+    start_id = (start[1] + 1) * stride + start[0] + 1
+    end_id = (end[1] + 1) * stride + end[0] + 1
+    ex, ey = end
+
+    h = octile(start[0], start[1], ex, ey)
+    g_scores[start_id] = 0.0
+    open_set = [(h, h, start_id)]
+    order = []
+    peak = 1
+    expansions = 0
+    stale = 0
+
+    while open_set:
+        if len(open_set) > peak:
+            peak = len(open_set)
+        current = heapq.heappop(open_set)[2]
+        if closed[current]:
+            stale += 1
+            continue
+        closed[current] = True
+        expansions += 1
+
+        if current == end_id:
+            _count_open(stats, expansions, expansions + stale + len(open_set), expansions + stale, stale, peak)
+            points = _walk_back(parents, current, stride)[::-1]
+            return _finish(name, True, _expand_jumps(points), order, stats, started, observer)
+
+        x, y = current % stride - 1, current // stride - 1
+        parent = parents[current]
+        if parent == -1:
+            dx = dy = 0
+        else:
+            dx = _sign(x - (parent % stride - 1))
+            dy = _sign(y - (parent // stride - 1))
+
+        for jump, steps, diagonal in successors(current, dx, dy):
+            if closed[jump]:
+                continue
+            tentative_g = g_scores[current] + steps * (DIAGONAL_COST if diagonal else 1.0)
+            old_g = g_scores[jump]
+            if tentative_g < old_g:
+                g_scores[jump] = tentative_g
+                parents[jump] = current
+                jx, jy = jump % stride - 1, jump // stride - 1
+                h = octile(jx, jy, ex, ey)
+                heapq.heappush(open_set, (tentative_g + h, h, jump))
+
+                if old_g == np.inf:
+                    order.append((jx, jy))
+                    if observer is not None:
+                        observer("visit", [(jx, jy)])
+
+    _count_open(stats, expansions, expansions + stale + len(open_set), expansions + stale, stale, peak)
+    return _finish(name, False, [], order, stats, started, observer)
+
+
+def jps(walls, start, end, observer=None):
+    # Jump Point Search: A* that only stops at cells where a path could
+    # bend, scanning straight and diagonal runs in between. Same costs and
+    # moves as a_star, so path costs match it exactly.
+    walls = _as_walls(walls)
+    stride = walls.shape[1] + 2
+    blocked = memoryview(_pad_walls(walls).ravel())
+    end_id = (end[1] + 1) * stride + end[0] + 1
+
+    def jump_straight(cell, step, side):
+        steps = 0
+        while True:
+            cell += step
+            steps += 1
+            if blocked[cell]:
+                return -1, steps
+            if cell == end_id:
+                return cell, steps
+            if ((blocked[cell + side] and not blocked[cell + side + step]) or
+                    (blocked[cell - side] and not blocked[cell - side + step])):
+                return cell, steps
+
+    def jump_diagonal(cell, step_x, step_y):
+        step = step_x + step_y
+        steps = 0
+        while True:
+            cell += step
+            steps += 1
+            if blocked[cell]:
+                return -1, steps
+            if cell == end_id:
+                return cell, steps
+            if ((blocked[cell - step_x] and not blocked[cell - step_x + step_y]) or
+                    (blocked[cell - step_y] and not blocked[cell + step_x - step_y])):
+                return cell, steps
+            if (jump_straight(cell, step_x, stride)[0] != -1 or
+                    jump_straight(cell, step_y, 1)[0] != -1):
+                return cell, steps
+
+    def successors(cell, dx, dy):
+        directions = DIRECTIONS if not (dx or dy) else _pruned_directions(blocked, cell, dx, dy, stride)
+        for ndx, ndy in directions:
+            if ndx and ndy:
+                jump, steps = jump_diagonal(cell, ndx, ndy * stride)
+            elif ndx:
+                jump, steps = jump_straight(cell, ndx, stride)
+            else:
+                jump, steps = jump_straight(cell, ndy * stride, 1)
+            if jump != -1:
+                yield jump, steps, bool(ndx and ndy)
+
+    return _jump_point_search("JPS", walls, start, end, observer, successors)
+
+
+class JumpTable:
+    # JPS+ preprocessing for one wall mask. For every cell and each of the
+    # eight DIRECTIONS, distances[direction, cell] is k > 0 when the next
+    # jump point in that direction is k steps away, or -k when there are
+    # only k free steps before a wall. Cells are flat ids on the map padded
+    # with one ring of walls, like the searches use internally.
+    def __init__(self, walls):
+        walls = _as_walls(walls)
+        self.shape = walls.shape
+        padded = _pad_walls(walls)
+        height, width = padded.shape
+        self.stride = width
+        self.distances = np.zeros((len(DIRECTIONS), height * width), dtype=np.int32)
+
+        def around(ox, oy):
+            # view with [y, x] -> padded[y + oy, x + ox] for interior cells
+            return padded[1 + oy:height - 1 + oy, 1 + ox:width - 1 + ox]
+
+        def forced_straight(dx, dy):
+            forced = np.zeros_like(padded)
+            if dx:
+                forced[1:-1, 1:-1] = ((around(0, 1) & ~around(dx, 1)) |
+                                      (around(0, -1) & ~around(dx, -1)))
+            else:
+                forced[1:-1, 1:-1] = ((around(1, 0) & ~around(1, dy)) |
+                                      (around(-1, 0) & ~around(-1, dy)))
+            return forced
+
+        tables = {}
+        for dx, dy in DIRECTIONS[:4]:
+            tables[dx, dy] = self._sweep(padded, forced_straight(dx, dy), dx, dy)
+
+        for dx, dy in DIRECTIONS[4:]:
+            jump_at = np.zeros_like(padded)
+            jump_at[1:-1, 1:-1] = ((around(-dx, 0) & ~around(-dx, dy)) |
+                                   (around(0, -dy) & ~around(dx, -dy)))
+            jump_at |= (tables[dx, 0] > 0) | (tables[0, dy] > 0)
+            tables[dx, dy] = self._sweep(padded, jump_at, dx, dy)
+
+        for index, direction in enumerate(DIRECTIONS):
+            self.distances[index] = tables[direction].ravel()
+
+    @staticmethod
+    def _sweep(blocked, jump_at, dx, dy):
+        # Fills one direction a whole column (or row) at a time, starting
+        # from the side the direction points at, since every cell only
+        # depends on its neighbour one step further along.
+        if not dx:
+            return JumpTable._sweep(blocked.T, jump_at.T, dy, 0).T.copy()
+
+        height, width = blocked.shape
+        distances = np.zeros(blocked.shape, dtype=np.int32)
+        rows = slice(1, height - 1)
+        next_rows = slice(1 + dy, height - 1 + dy)
+        columns = range(width - 2, 0, -1) if dx > 0 else range(1, width - 1)
+
+        for x in columns:
+            ahead = distances[next_rows, x + dx]
+            distances[rows, x] = np.where(
+                blocked[next_rows, x + dx], 0,
+                np.where(jump_at[next_rows, x + dx], 1,
+                         np.where(ahead > 0, ahead + 1, ahead - 1)))
+
+        distances[blocked] = 0
+        return distances
+
+
+def jps_plus(walls, start, end, observer=None, table=None):
+    # JPS+ reads jump distances from a precomputed JumpTable instead of
+    # scanning, so repeated queries on one map only pay for the table once.
+    # The goal is caught when it lies within reach along a run.
+    walls = _as_walls(walls)
+    if table is None:
+        table = JumpTable(walls)
+    stride = table.stride
+    blocked = memoryview(_pad_walls(walls).ravel())
+    distances = [memoryview(row) for row in table.distances]
+    direction_index = {direction: index for index, direction in enumerate(DIRECTIONS)}
+    ex, ey = end
+
+    def successors(cell, dx, dy):
+        x, y = cell % stride - 1, cell // stride - 1
+        to_x, to_y = ex - x, ey - y
+        directions = DIRECTIONS if not (dx or dy) else _pruned_directions(blocked, cell, dx, dy, stride)
+
+        for ndx, ndy in directions:
+            distance = distances[direction_index[ndx, ndy]][cell]
+            reach = abs(distance)
+            step = ndy * stride + ndx
+
+            if ndx and ndy:
+                if _sign(to_x) == ndx and _sign(to_y) == ndy:
+                    steps = min(abs(to_x), abs(to_y))
+                    if steps <= reach:
+                        yield cell + steps * step, steps, True
+                        continue
+                if distance > 0:
+                    yield cell + distance * step, distance, True
+            else:
+                along, across = (to_x, to_y) if ndx else (to_y, to_x)
+                if across == 0 and _sign(along) == (ndx or ndy) and abs(along) <= reach:
+                    yield cell + abs(along) * step, abs(along), False
+                elif distance > 0:
+                    yield cell + distance * step, distance, False
+
+    return _jump_point_search("JPS+", walls, start, end, observer, successors)
+
+
+def densify(points):
+    # Every cell crossed by the straight legs between consecutive points.
+    cells = [points[0]]
+    for point1, point2 in zip(points, points[1:]):
+        for cell in interpolate_path(point1, point2):
+            if cell != cells[-1]:
+                cells.append(cell)
+    return cells
+
+
+def ib_rrt_star(walls, start, end, observer=None, rng=None, max_iterations=None,
+                rewire=True, anytime=False, time_budget=None, checker=None):
+    # rewire=True runs proper RRT*: each new node picks the cheapest parent
+    # within the neighbourhood radius and then rewires its neighbours through
+    # itself. anytime=True keeps sampling after the first connection until
+    # max_iterations or time_budget (seconds) runs out, returning the best
+    # path found; every improvement is logged in stats.cost_history as
+    # (seconds, cost). Edges are tested with a collision.CollisionChecker;
+    # pass checker= to reuse one built for the same walls.
+    walls = _as_walls(walls)
+    height, width = walls.shape
+    rng = rng or random
+    if max_iterations is None:
+        # Tree queries go through a spatial index, so the budget can grow
+        # with the map instead of staying at the old fixed 2000. A time
+        # budget on its own leaves the iteration count open.
+        max_iterations = None if time_budget else max(2000, width * height // 4)
+    stats = SolveStats()
+    started = time.perf_counter()
+    checker = checker or CollisionChecker(walls)
+
+    step_size = 3
+    connect_radius = 5
+    # RRT* neighbourhood radius gamma * sqrt(log n / n), kept between the
+    # step size and a small cap so early trees still find neighbours.
+    gamma = 2 * (1.5 * np.count_nonzero(~walls) / np.pi) ** 0.5
+    max_rewire_radius = 3 * step_size
+
+    class Node:
+        def __init__(self, position, parent=None, cost=0.0):
+            self.position = position
+            self.parent = parent
+            self.cost = cost
+            self.children = []
+
+    class Tree:
+        def __init__(self, root):
+            self.root = root
+            self.nodes = {}
+            self.index = BucketGrid()
+            self.add(Node(root))
+
+        def add(self, node):
+            self.nodes[node.position] = node
+            self.index.insert(node.position, node)
+            if node.parent is not None:
+                node.parent.children.append(node)
+
+    def distance(pos1, pos2):
+        return ((pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2) ** 0.5
+
+    def clear(pos1, pos2):
+        stats.collision_checks += 1
+        return checker.line_of_sight(pos1, pos2)
+
+    def clear_from(position, nodes):
+        # Which of nodes see position, in one segments_clear call.
+        if not nodes:
+            return []
+        stats.collision_checks += len(nodes)
+        return checker.segments_clear([node.position for node in nodes], [position] * len(nodes)).tolist()
+
+    def rewire_radius(tree):
+        n = len(tree.nodes) + 1
+        radius = gamma * (np.log(n) / n) ** 0.5
+        return max(step_size, min(max_rewire_radius, radius))
+
+    def reparent(node, parent, cost):
+        node.parent.children.remove(node)
+        node.parent = parent
+        parent.children.append(node)
+
+        delta = node.cost - cost
+        pending = [node]
+        while pending:
+            current = pending.pop()
+            current.cost -= delta
+            pending.extend(current.children)
+
+    def extend_tree(tree, target_pos):
+        nearest_node = tree.index.nearest(target_pos)
+        current_pos = nearest_node.position
+
+        dx = target_pos[0] - current_pos[0]
+        dy = target_pos[1] - current_pos[1]
+        dist = (dx * dx + dy * dy) ** 0.5
+
+        if dist == 0:
+            return None
+
+        dx = int(round(dx / dist * step_size))
+        dy = int(round(dy / dist * step_size))
+
+        new_x = current_pos[0] + dx
+        new_y = current_pos[1] + dy
+        new_pos = (new_x, new_y)
+
+        if checker.blocked(new_x, new_y) or new_pos in tree.nodes:
+            return None
+
+        if not clear(current_pos, new_pos):
+            return None
+
+        parent = nearest_node
+        new_cost = nearest_node.cost + distance(current_pos, new_pos)
+        near = tree.index.within(new_pos, rewire_radius(tree)) if rewire else []
+
+        # Every neighbour cheaper than the nearest node is a candidate
+        # parent; their edges are tested together.
+        candidates = [(node.cost + distance(node.position, new_pos), node) for node in near]
+        candidates = [(cost, node) for cost, node in candidates if cost < new_cost]
+        for (cost, node), visible in zip(candidates, clear_from(new_pos, [node for _, node in candidates])):
+            if visible and cost < new_cost:
+                parent, new_cost = node, cost
+
+        new_node = Node(new_pos, parent, new_cost)
+        tree.add(new_node)
+        stats.expansions += 1
+
+        # Rewiring only lowers costs, so a node that is not worth rewiring
+        # now will not be after an earlier one is rewired; test the rest in
+        # one batch and re-check their costs as the loop goes.
+        candidates = [node for node in near if node is not parent and
+                      new_cost + distance(new_pos, node.position) < node.cost - 1e-9]
+        for node, visible in zip(candidates, clear_from(new_pos, candidates)):
+            cost = new_cost + distance(new_pos, node.position)
+            if visible and cost < node.cost - 1e-9:
+                reparent(node, new_node, cost)
+
+        path = interpolate_path(parent.position, new_pos)
+        order.extend(path)
+        if observer is not None:
+            observer("visit", path)
+
+        return new_node
+
+    def construct_path(node):
+        path = []
+        current = node
+        while current is not None:
+            path.append(current.position)
+            current = current.parent
+        return path[::-1]
+
+    def connection_cost(connection):
+        start_side, end_side = connection
+        return start_side.cost + distance(start_side.position, end_side.position) + end_side.cost
+
+    def connection_path(connection):
+        start_side, end_side = connection
+        return densify(construct_path(start_side) + construct_path(end_side)[::-1])
+
+    start_tree = Tree(start)
+    end_tree = Tree(end)
+    order = []
+    # Each connection is a (start-tree node, end-tree node) pair. Rewiring
+    # only ever lowers node costs, so a connection stays valid and is just
+    # re-priced when looking for the best one.
+    connections = []
+    best_cost = None
+
+    goal_bias = 0.2
+    iteration = 0
+
+    while max_iterations is None or iteration < max_iterations:
+        if time_budget is not None and time.perf_counter() - started >= time_budget:
+            break
+
+        if iteration % 2 == 0:
+            active_tree = start_tree
+            other_tree = end_tree
+        else:
+            active_tree = end_tree
+            other_tree = start_tree
+        iteration += 1
+
+        if rng.random() < goal_bias:
+            target = other_tree.root
+        else:
+            target = (rng.randint(1, width - 2),
+                      rng.randint(1, height - 2))
+
+        new_node = extend_tree(active_tree, target)
+        connected = False
+
+        if new_node:
+            reachable = other_tree.index.within(new_node.position, connect_radius)
+            for other_node, visible in zip(reachable, clear_from(new_node.position, reachable)):
+                if visible:
+                    if active_tree is start_tree:
+                        connections.append((new_node, other_node))
+                    else:
+                        connections.append((other_node, new_node))
+                    connected = True
+                    break
+
+            if connections and not anytime:
+                return _finish("IB-RRT*", True, connection_path(connections[-1]),
+                               order, stats, started, observer)
+
+        # Rewiring keeps lowering costs in the background, so connections are
+        # re-priced on every new one and otherwise every 50 iterations.
+        if connected or (connections and iteration % 50 == 0):
+            cost = min(connection_cost(connection) for connection in connections)
+            if best_cost is None or cost < best_cost - 1e-9:
+                best_cost = cost
+                stats.cost_history.append((time.perf_counter() - started, cost))
+
+    if connections:
+        best = min(connections, key=connection_cost)
+        return _finish("IB-RRT*", True, connection_path(best), order, stats, started, observer)
+
+    return _finish("IB-RRT*", False, [], order, stats, started, observer)
+
+
+def lazy_theta_star(walls, start, end, observer=None, checker=None):
+    # Any-angle A*: a cell may take its parent's parent as its own parent
+    # when the two see each other, so paths bend only at wall corners. The
+    # lazy variant assumes that line of sight when a cell is generated and
+    # checks it only once the cell is expanded, falling back to the best
+    # expanded neighbour if it fails. Costs are Euclidean between cell
+    # centres, with an Euclidean heuristic.
+    walls = _as_walls(walls)
+    height, width = walls.shape
+    stats = SolveStats()
+    started = time.perf_counter()
+    checker = checker or CollisionChecker(walls)
+    line_of_sight = checker.line_of_sight
+    checks = checker.checks
+
+    stride = width + 2
+    size = stride * (height + 2)
+    blocked = memoryview(_pad_walls(walls).ravel())
+    g_array = np.full(size, np.inf)
+    parent_array = np.full(size, -1, dtype=np.int32)
+    closed_array = np.zeros(size, dtype=bool)
+    g_scores = memoryview(g_array)
+    parents = memoryview(parent_array)
+    closed = memoryview(closed_array)
+
+    offsets = [(dy * stride + dx, DIAGONAL_COST if dx and dy else 1.0) for dx, dy in DIRECTIONS]
+    start_id = (start[1] + 1) * stride + start[0] + 1
+    end_id = (end[1] + 1) * stride + end[0] + 1
+    ex, ey = end
+
+    def cell(cell_id):
+        return cell_id % stride - 1, cell_id // stride - 1
+
+    def euclid(x1, y1, x2, y2):
+        return ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5
+
+    h = euclid(start[0], start[1], ex, ey)
+    g_scores[start_id] = 0.0
+    parents[start_id] = start_id
+    open_set = [(h, h, start_id)]
+    order = []
+    peak = 1
+    expansions = 0
+    stale = 0
+
+    while open_set:
+        if len(open_set) > peak:
+            peak = len(open_set)
+        current = heapq.heappop(open_set)[2]
+        if closed[current]:
+            stale += 1
+            continue
+
+        x, y = cell(current)
+        parent = parents[current]
+        if parent != current and not line_of_sight(cell(parent), (x, y)):
+            # The assumed shortcut is blocked: take the cheapest expanded
+            # neighbour instead, which always sees this cell.
+            best = np.inf
+            for offset, cost in offsets:
+                neighbor = current + offset
+                if closed[neighbor] and g_scores[neighbor] + cost < best:
+                    best = g_scores[neighbor] + cost
+                    parents[current] = neighbor
+            g_scores[current] = best
+            parent = parents[current]
+
+        closed[current] = True
+        expansions += 1
+
+        if current == end_id:
+            stats.collision_checks = checker.checks - checks
+            _count_open(stats, expansions, expansions + stale + len(open_set), expansions + stale, stale, peak)
+            points = [cell(current)]
+            while parents[current] != current:
+                current = parents[current]
+                points.append(cell(current))
+            points.reverse()
+            result = _finish("Theta*", True, densify(points), order, stats, started, observer)
+            result.waypoints = points
+            return result
+
+        px, py = cell(parent)
+        parent_g = g_scores[parent]
+        for offset, _ in offsets:
+            neighbor = current + offset
+            if blocked[neighbor] or closed[neighbor]:
+                continue
+            nx, ny = cell(neighbor)
+            tentative_g = parent_g + euclid(px, py, nx, ny)
+            old_g = g_scores[neighbor]
+            if tentative_g < old_g:
+                g_scores[neighbor] = tentative_g
+                parents[neighbor] = parent
+                h = euclid(nx, ny, ex, ey)
+                heapq.heappush(open_set, (tentative_g + h, h, neighbor))
+
+                if old_g == np.inf:
+                    order.append((nx, ny))
+                    if observer is not None:
+                        observer("visit", [(nx, ny)])
+
+    stats.collision_checks = checker.checks - checks
+    _count_open(stats, expansions, expansions + stale + len(open_set), expansions + stale, stale, peak)
+    return _finish("Theta*", False, [], order, stats, started, observer)
+
+
+def shortcut(path, walls=None, checker=None):
+    # Greedy string pulling over any cell path: from each corner, run along
+    # the path while the corner still sees the next cell, and make a new
+    # corner at the last cell it did see. Returns the corners.
+    if len(path) < 3:
+        return list(path)
+    checker = checker or CollisionChecker(walls)
+    corners = [path[0]]
+    for previous, current in zip(path, path[1:]):
+        if not checker.line_of_sight(corners[-1], current):
+            corners.append(previous)
+    corners.append(path[-1])
+    return corners
+
+
+def smooth(result, walls=None, checker=None):
+    # A copy of any solver's result with its path shortcut; the time taken
+    # is added to stats.elapsed.
+    if not result.found:
+        return result
+    started = time.perf_counter()
+    waypoints = shortcut(result.waypoints or result.path, walls, checker)
+    stats = copy.copy(result.stats)
+    stats.elapsed += time.perf_counter() - started
+    return SolveResult(result.algorithm, True, densify(waypoints), result.visited, stats, waypoints)
+
+
+ALGORITHMS = {
+    "BFS": bfs,
+    "DFS": dfs,
+    "A*": a_star,
+    "IB-RRT*": ib_rrt_star,
+    "JPS": jps,
+    "JPS+": jps_plus,
+    "BFS-frontier": bfs_frontier,
+    "BFS-bidir": bfs_bidirectional,
+    "Theta*": lazy_theta_star,
+    "Dijkstra": dijkstra,
+}
+
+# Solvers that take a costs array of per-cell traversal costs.
+WEIGHTED = {"A*", "Dijkstra"}
+
+# Same map, start and end always give the same result, so a finished run
+# can be replayed instead of searched again.
+DETERMINISTIC = {"BFS", "A*", "JPS", "JPS+", "BFS-frontier", "BFS-bidir", "Theta*", "Dijkstra"}
+
+
+def _timed(observer, totals):
+    def timed(event, cells):
+        began = time.perf_counter()
+        observer(event, cells)
+        totals[0] += time.perf_counter() - began
+    return timed
+
+
+def solve(algorithm, walls, start, end, observer=None, profile=None, components=None, **options):
+    # Observer calls are timed so stats can tell drawing apart from search.
+    # profile=True runs the solver under cProfile and keeps the pstats in
+    # stats.profile; a path also dumps them there for snakeviz and friends.
+    # components, a components.ComponentMap of the same walls, answers
+    # "no path" without searching when start and end are not connected.
+    solver = ALGORITHMS[algorithm]
+    if components is not None and not components.connected(start, end):
+        return SolveResult(algorithm, False, [], [], SolveStats())
+    render = [0.0]
+    if observer is not None:
+        observer = _timed(observer, render)
+
+    if profile:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(solver, walls, start, end, observer=observer, **options)
+        result.stats.profile = pstats.Stats(profiler)
+        if profile is not True:
+            profiler.dump_stats(profile)
+    else:
+        result = solver(walls, start, end, observer=observer, **options)
+
+    result.stats.render_time = render[0]
+    return result
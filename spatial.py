@@ -0,0 +1,117 @@
+class BucketGrid:
+    # Uniform bucket grid over cell coordinates. Points go into square
+    # buckets of bucket_size cells, so inserts are O(1) and nearest/radius
+    # queries only look at the buckets around the query point.
+    def __init__(self, bucket_size=8):
+        self.bucket_size = bucket_size
+        self.buckets = {}
+        self.count = 0
+        self.min_bucket = None
+        self.max_bucket = None
+
+    def __len__(self):
+        return self.count
+
+    def _key(self, position):
+        return position[0] // self.bucket_size, position[1] // self.bucket_size
+
+    def insert(self, position, item):
+        key = self._key(position)
+        self.buckets.setdefault(key, []).append((position, item))
+        self.count += 1
+
+        if self.min_bucket is None:
+            self.min_bucket = key
+            self.max_bucket = key
+        else:
+            self.min_bucket = (min(self.min_bucket[0], key[0]), min(self.min_bucket[1], key[1]))
+            self.max_bucket = (max(self.max_bucket[0], key[0]), max(self.max_bucket[1], key[1]))
+
+    def _ring(self, center, radius):
+        # Buckets at Chebyshev distance radius from center, clipped to the
+        # occupied bounding box.
+        cx, cy = center
+        (low_x, low_y), (high_x, high_y) = self.min_bucket, self.max_bucket
+        if radius == 0:
+            yield center
+            return
+
+        first_x, last_x = max(cx - radius, low_x), min(cx + radius, high_x)
+        for by in (cy - radius, cy + radius):
+            if low_y <= by <= high_y:
+                for bx in range(first_x, last_x + 1):
+                    yield bx, by
+
+        first_y, last_y = max(cy - radius + 1, low_y), min(cy + radius - 1, high_y)
+        for bx in (cx - radius, cx + radius):
+            if low_x <= bx <= high_x:
+                for by in range(first_y, last_y + 1):
+                    yield bx, by
+
+    def nearest(self, position):
+        # Walks outwards ring by ring. Anything in ring r + 1 is at least
+        # r * bucket_size away, so the walk stops as soon as the best match
+        # so far is closer than that. Rings are clipped to the occupied
+        # buckets, and once more buckets have been probed than there are
+        # points a plain scan over the points is cheaper, so that wins.
+        if not self.count:
+            return None
+
+        px, py = position
+        center = self._key(position)
+        (low_x, low_y), (high_x, high_y) = self.min_bucket, self.max_bucket
+        max_radius = max(center[0] - low_x, high_x - center[0],
+                         center[1] - low_y, high_y - center[1])
+        # Rings closer in than the occupied box are empty; skip straight to it.
+        min_radius = max(low_x - center[0], center[0] - high_x,
+                         low_y - center[1], center[1] - high_y, 0)
+
+        best_item = None
+        best_dist = None
+        probed = 0
+        for radius in range(min_radius, max_radius + 1):
+            if probed > self.count:
+                return self._scan(position)
+            for key in self._ring(center, radius):
+                probed += 1
+                for (x, y), item in self.buckets.get(key, ()):
+                    dist = (x - px) * (x - px) + (y - py) * (y - py)
+                    if best_dist is None or dist < best_dist:
+                        best_dist = dist
+                        best_item = item
+            if best_dist is not None and best_dist <= (radius * self.bucket_size) ** 2:
+                break
+
+        return best_item
+
+    def _scan(self, position):
+        px, py = position
+        best_item = None
+        best_dist = None
+        for bucket in self.buckets.values():
+            for (x, y), item in bucket:
+                dist = (x - px) * (x - px) + (y - py) * (y - py)
+                if best_dist is None or dist < best_dist:
+                    best_dist = dist
+                    best_item = item
+        return best_item
+
+    def within(self, position, radius):
+        # Items strictly closer than radius, nearest first.
+        px, py = position
+        low_x = int((px - radius) // self.bucket_size)
+        low_y = int((py - radius) // self.bucket_size)
+        high_x = int((px + radius) // self.bucket_size)
+        high_y = int((py + radius) // self.bucket_size)
+
+        found = []
+        limit = radius * radius
+        for bx in range(low_x, high_x + 1):
+            for by in range(low_y, high_y + 1):
+                for (x, y), item in self.buckets.get((bx, by), ()):
+                    dist = (x - px) * (x - px) + (y - py) * (y - py)
+                    if dist < limit:
+                        found.append((dist, len(found), item))
+
+        found.sort(key=lambda entry: entry[:2])
+        return [item for _, _, item in found]
@@ -0,0 +1,111 @@
+import queue
+import threading
+
+import solvers
+
+
+class Cancelled(Exception):
+    pass
+
+
+class SolveWorker:
+    # Runs one solve on a background thread. The solver's observer only puts
+    # (event, cells) on a queue for the UI to drain at its own pace; it is
+    # also where cancel and pause take effect, so a search stops or waits
+    # between two updates without the solvers knowing about threads.
+    def __init__(self, algorithm, walls, start, end, replay=None, on_done=None, **options):
+        self.algorithm = algorithm
+        self.walls = walls
+        self.start_point = start
+        self.end_point = end
+        self.options = options
+        self.replay = replay
+        self.on_done = on_done
+
+        self.events = queue.Queue()
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self._carry = None
+        self.ended = False
+        self._cancel = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _observer(self, event, cells):
+        self._running.wait()
+        if self._cancel.is_set():
+            raise Cancelled()
+        self.events.put((event, list(cells)))
+
+    def _run(self):
+        try:
+            if self.replay is not None:
+                # A memoised result is streamed like a live run.
+                self._observer("visit", self.replay.visited)
+                if self.replay.found:
+                    self._observer("path", self.replay.path)
+                self.result = self.replay
+            else:
+                self.result = solvers.solve(self.algorithm, self.walls, self.start_point, self.end_point,
+                                            observer=self._observer, **self.options)
+            if self.on_done is not None:
+                self.on_done(self.result)
+        except Cancelled:
+            self.cancelled = True
+        except Exception as error:
+            self.error = error
+        finally:
+            self.events.put(None)
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def cancel(self):
+        self._cancel.set()
+        self._running.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    def drain(self, max_cells):
+        # Up to max_cells cells' worth of updates, splitting a large event
+        # so the rest is handed out on the next call.
+        updates = []
+        budget = max_cells
+        while budget > 0 and not self.ended:
+            if self._carry is not None:
+                item, self._carry = self._carry, None
+            else:
+                try:
+                    item = self.events.get_nowait()
+                except queue.Empty:
+                    break
+            if item is None:
+                self.ended = True
+                break
+
+            event, cells = item
+            if len(cells) > budget:
+                self._carry = (event, cells[budget:])
+                cells = cells[:budget]
+            updates.append((event, cells))
+            budget -= max(len(cells), 1)
+        return updates
+
+    @property
+    def finished(self):
+        # The worker is done and every update it produced has been drained.
+        return self.ended and self._carry is None